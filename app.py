@@ -1,35 +1,48 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import numpy as np
 import pandas as pd
 import streamlit as st
 import plotly.express as px
-from io import BytesIO
 
-# ----------------- konlpy(Okt) optional import -----------------
-try:
-    from konlpy.tag import Okt
-    okt_available = True
-    okt = Okt()
-except ModuleNotFoundError:
-    okt_available = False
+from engine import (
+    CACHE_DIR, DEFAULT_FINDINGS, DEFAULT_STANDARDS, NOUN_BACKEND, NOUN_BENCH_SAMPLE, SOURCE_COLUMN, ClauseTrie,
+    DuckDBBackend, FilterIndex, NounMatrix, StatsCube, TextIndex, benchmark_noun_backends, build_sort_ranks,
+    compact_frame, duckdb_available, noun_backend_available, page_rows, prepare,
+)
+from exporter import EXPORT_FORMATS, arrow_safe, export_bytes
+from ingest import content_key, expand_uploads, parse_many, upload_batch_key
+from warehouse import Warehouse
+
+# 업로드 스냅숏 위치 (명사 캐시와 같은 CACHE_DIR 아래)
+SNAPSHOT_DIR = CACHE_DIR / "snapshots"
 
-# ----------------- 페이지 설정 -----------------
-st.set_page_config(page_title="인정평가 부적합 분석(ISO/IEC 17021-1 기반)", layout="wide")
+# 검색·집계 백엔드: pandas(기본) 또는 duckdb (duckdb 미설치 시 pandas로 대체)
+QUERY_BACKEND = os.environ.get("FINDINGS_BACKEND", "pandas").strip().lower()
+USE_DUCKDB = QUERY_BACKEND == "duckdb" and duckdb_available
 
 # ----------------- 상단 로고 + 제목 -----------------
-st.markdown(
-    """
-    <div style="display:flex; align-items:center;">
-        <img src="https://img.icons8.com/color/96/000000/book.png" width="60" style="margin-right:13px"/>
-        <h1 style="margin:0;"> 부적합 작성 가이드</h1>
-    </div>
-    """,
-    unsafe_allow_html=True,
-)
+def render_header():
+    st.markdown(
+        """
+        <div style="display:flex; align-items:center;">
+            <img src="https://img.icons8.com/color/96/000000/book.png" width="60" style="margin-right:13px"/>
+            <h1 style="margin:0;"> 부적합 작성 가이드</h1>
+        </div>
+        """,
+        unsafe_allow_html=True,
+    )
 
 # ----------------- 가이드 탭 -----------------
-tab1, tab2, tab3 = st.tabs(["📖 부적합 정의", "✍️ 부적합 작성법", "⚖️ 부적합 vs 권고사항"])
+def render_guide():
+    tab1, tab2, tab3 = st.tabs(["📖 부적합 정의", "✍️ 부적합 작성법", "⚖️ 부적합 vs 권고사항"])
 
-with tab1:
-    st.markdown("""
+    with tab1:
+        st.markdown("""
 ### 부적합 (Nonconformity)이란?
 **ISO 정의**  
 > *non-fulfillment of a requirement*  
@@ -38,8 +51,8 @@ with tab1:
 ISO 9001 심사 실행 지침 등 ISO Auditing Practices Group 문서에서도 이 정의를 사용하며, 부적합을 문서화할 때는 **“요구사항 위반 → 객관적 증거 → 원인 → 시정 조치(재발 방지 계획)”** 체계가 필요합니다.  
 """)
 
-with tab2:
-    st.markdown("""
+    with tab2:
+        st.markdown("""
 ### 부적합 작성법
 아래는 ISO 9001 Auditing Practices Group(APG) 문서와 ISO/ISO 19011, ISO 17021-1 등에 기반한 부적합 작성 가이드입니다.
 
@@ -62,8 +75,8 @@ APG 문서는 “a well-documented nonconformity”를 위해 다음 세 부분
 | **검증 및 종결** | 평가사(심사원)가 시정조치 유효성 검증 후 종결 | ISO/APG |
 """)
 
-with tab3:
-    st.markdown("""
+    with tab3:
+        st.markdown("""
 ### 부적합 (Nonconformity) vs 권고사항 / 개선기회 (Recommendation / OFI)의 구별 — "기준과 실제 구분"
 
 부적합과 권고사항(또는 “개선 기회, Observation / OFI”)은 평가 및 경영시스템 운영 시 자주 혼동되는 개념이므로, 구별 기준을 명확히 두는 것이 중요합니다. 아래 기준들을 중심으로 설명드립니다. 
@@ -94,187 +107,618 @@ ISO 19011:2018 제6.4.10항에서는 “recommendations (권고사항)” 또는
 | **명령적 표현 사용 여부** | “~하지 않음”, “~이 없음”, “~미준수/미흡” 등 부정적 표현 | “~필요함”, “권고함”, “검토할 필요 있음” 등 제안형 표현 |
 """)
 
-st.markdown("---")
-
-# ----------------- 기본 데이터 -----------------
-DEFAULT_FINDINGS = pd.DataFrame({
-    "인정기준": ["KAB-R-MSCB"]*6,
-    "조항": ["7", "7.1", "7.2", "8.3", "9.1", "9.2"],
-    "세부조항": ["7.1", "7.1.1", "7.1.2", "8.3.1", "9.1.1", "9.2.2"],
-    "구분": ["부적합", "권고", "부적합", "권고", "부적합", "권고"],
-    "내용": [
-        "조직은 품질경영시스템 자원의 충분성을 확보하지 못함.",
-        "프로세스 운영계획서에 인원 배치가 미흡함.",
-        "고객 요구사항 검토 절차 미이행.",
-        "변경관리 절차서가 최신화되어 있지 않음.",
-        "내부심사 계획이 적시에 수립되지 않음.",
-        "고객만족도 조사 절차 개선 필요."
-    ]
-})
-DEFAULT_STANDARDS = pd.DataFrame({
-    "조항": ["7", "7.1", "7.2", "8.3", "9.1", "9.2"],
-    "요구사항": [
-        "조직은 필요한 자원을 결정하고 제공해야 한다.",
-        "조직은 인프라를 포함한 필요한 자원을 제공해야 한다.",
-        "조직은 인적 자원의 역량을 보장해야 한다.",
-        "제품 및 서비스 설계개발을 관리해야 한다.",
-        "모니터링 및 측정을 통해 시스템 성과를 평가해야 한다.",
-        "내부심사를 계획하고 실시해야 한다."
-    ]
-})
-
-# ----------------- 유틸 -----------------
-def drop_noise_columns(df):
-    noise = {"기관명","평가종류","시작일","종료일","발행번호"}
-    unnamed = [c for c in df.columns if str(c).startswith("Unnamed")]
-    return df.drop(columns=list(noise)+unnamed, errors="ignore")
-
-def add_req_text(findings, standards):
-    if standards is None:
-        return findings
-    std_cols = standards.columns
-    clause_col = next((c for c in std_cols if c in ["조항","Clause","항목"]), None)
-    req_col = next((c for c in std_cols if c in ["요구사항","Requirement","내용"]), None)
-    if not clause_col or not req_col:
-        return findings
-    std = standards.copy()
-    std[clause_col] = std[clause_col].astype(str)
-    f = findings.copy()
-    def match_req(row):
-        sub = str(row.get("세부조항"))
-        main = str(row.get("조항"))
-        if sub in std[clause_col].values:
-            vals = std.loc[std[clause_col]==sub, req_col].values
-            return vals[0] if len(vals) > 0 else ""
-        if main in std[clause_col].values:
-            vals = std.loc[std[clause_col]==main, req_col].values
-            return vals[0] if len(vals) > 0 else ""
-        return ""
-    f["요구사항"] = f.apply(match_req, axis=1)
-    return f
-
-def extract_nouns(text_series):
-    """한글 텍스트에서 명사만 추출 (konlpy 없으면 skip)"""
-    if not okt_available:
-        return pd.Series(dtype=str)
-    nouns = []
-    for txt in text_series.dropna():
-        nouns.extend(okt.nouns(txt))
-    return pd.Series(nouns)
+# ----------------- 워크북별 캐시 -----------------
+# 엔진 객체는 업로드 파일 해시(workbook_key)별로 1회 생성해 세션 간 공유
+@st.cache_resource(max_entries=8, show_spinner=False)
+def get_filter_index(workbook_key, _findings):
+    return FilterIndex(_findings)
+
+@st.cache_resource(max_entries=8, show_spinner=False)
+def get_text_index(workbook_key, _text_series):
+    return TextIndex(_text_series)
+
+@st.cache_resource(max_entries=8, show_spinner=False)
+def get_clause_trie(workbook_key, _findings):
+    return ClauseTrie(_findings)
+
+@st.cache_resource(max_entries=8, show_spinner=False)
+def get_sort_ranks(workbook_key, _findings, columns):
+    return build_sort_ranks(_findings, columns)
+
+@st.cache_resource(max_entries=8, show_spinner=False)
+def get_stats_cube(workbook_key, _findings):
+    return StatsCube(_findings)
+
+@st.cache_resource(max_entries=8, show_spinner=False)
+def get_duckdb_backend(workbook_key, _findings, _standards):
+    """findings와 standards를 각각 테이블로 등록 (standards는 sql()로 조인 조회용)"""
+    return DuckDBBackend(_findings, _standards)
+
+@st.cache_resource
+def get_warehouse():
+    """누적 저장소 연결 (프로세스당 1개, FINDINGS_WAREHOUSE로 위치 변경)"""
+    return Warehouse()
+
+# ----------------- 백그라운드 작업 -----------------
+# 화면 실행 밖에서 도는 오래 걸리는 계산 — 화면은 Future의 완료 여부만 확인하고 기다리지 않음
+NOUN_JOBS_MAX_ENTRIES = 8
+
+class BackgroundJobs:
+    """키 → Future (같은 키는 한 번만 실행, 세션 간 공유, 최근 max_entries개만 보관)"""
+
+    def __init__(self, max_entries, workers=1):
+        self.max_entries = max_entries
+        self._futures = OrderedDict()
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="background")
+
+    def get(self, key):
+        with self._lock:
+            return self._futures.get(key)
+
+    def submit(self, key, fn, *args):
+        with self._lock:
+            future = self._futures.get(key)
+            if future is None:
+                future = self._futures[key] = self._pool.submit(fn, *args)
+            self._store(key, future)
+            return future
+
+    def put(self, key, value):
+        """이미 계산된 값을 완료된 작업으로 등록"""
+        future = Future()
+        future.set_result(value)
+        with self._lock:
+            self._store(key, future)
+        return future
+
+    def _store(self, key, future):
+        self._futures[key] = future
+        self._futures.move_to_end(key)
+        while len(self._futures) > self.max_entries:
+            # 아직 시작하지 않은 작업만 취소됨 (실행 중인 작업은 끝까지 돌고 결과는 버려짐)
+            self._futures.popitem(last=False)[1].cancel()
+
+@st.cache_resource
+def get_noun_jobs():
+    """워크북별 명사 행렬 생성 작업 (workbook_key = 업로드 파일 해시, 작업자 1개 — 분석기는 프로세스당 1개)"""
+    return BackgroundJobs(NOUN_JOBS_MAX_ENTRIES)
+
+# ----------------- 업로드 캐시 -----------------
+WORKBOOK_CACHE_MAX_ENTRIES = 8
+WORKBOOK_CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+class LRUCache:
+    """키 → 값 LRU 캐시 (항목 수 + 메모리 상한, 스레드 안전)"""
+
+    def __init__(self, max_entries, max_bytes):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._nbytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            return self._entries[key][0]
+
+    def put(self, key, value, nbytes):
+        # 상한보다 큰 파일은 캐시하지 않음 (다른 항목을 모두 밀어내지 않도록)
+        if nbytes > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._nbytes -= self._entries.pop(key)[1]
+            self._entries[key] = (value, nbytes)
+            self._nbytes += nbytes
+            while len(self._entries) > self.max_entries or self._nbytes > self.max_bytes:
+                _, (_, old_nbytes) = self._entries.popitem(last=False)
+                self._nbytes -= old_nbytes
+
+@st.cache_resource
+def get_workbook_cache():
+    """세션 간 공유되는 프로세스 단위 업로드 캐시"""
+    return LRUCache(WORKBOOK_CACHE_MAX_ENTRIES, WORKBOOK_CACHE_MAX_BYTES)
+
+def frame_nbytes(*frames):
+    return sum(int(f.memory_usage(deep=True).sum()) for f in frames if f is not None)
+
+def to_snapshot_frame(frame):
+    """parquet 저장용 정리: 혼합 object 컬럼은 문자열, 범주 컬럼은 사전 인코딩"""
+    return compact_frame(arrow_safe(frame))
+
+def snapshot_paths(key):
+    return SNAPSHOT_DIR / f"{key}.findings.parquet", SNAPSHOT_DIR / f"{key}.standards.parquet"
+
+def read_snapshot(key):
+    """저장된 스냅숏 → (findings, standards 또는 None), 없으면 None (memory-map으로 읽음)"""
+    findings_path, standards_path = snapshot_paths(key)
+    if not findings_path.exists():
+        return None
+    findings = pd.read_parquet(findings_path, memory_map=True)
+    standards = pd.read_parquet(standards_path, memory_map=True) if standards_path.exists() else None
+    return findings, standards
+
+def write_snapshot(key, findings, standards):
+    # findings 파일이 있으면 완성된 스냅숏 → standards를 먼저, 각각 임시 파일 후 교체
+    findings_path, standards_path = snapshot_paths(key)
+    try:
+        SNAPSHOT_DIR.mkdir(parents=True, exist_ok=True)
+        for frame, path in [(standards, standards_path), (findings, findings_path)]:
+            if frame is None:
+                continue
+            tmp = path.with_name(path.name + ".tmp")
+            frame.to_parquet(tmp, index=False)
+            os.replace(tmp, path)
+    except OSError:  # 캐시 디렉터리에 쓸 수 없으면 스냅숏 없이 진행
+        pass
+
+def load_workbooks(files):
+    """업로드 파일들(zip 포함) → (묶음 키, findings, standards, 파일별 로드 결과)
+
+    파일마다 내용 해시로 메모리 캐시 → 스냅숏 순으로 조회하고, 새 파일만 모아
+    프로세스 풀에서 동시에 파싱. findings는 출처파일 컬럼을 붙여 하나로 합침
+    """
+    items = expand_uploads([(f.name, f.getvalue()) for f in files])
+    keys = [content_key(data) for _, data in items]
+    batch_key = upload_batch_key(keys)
+    cache = get_workbook_cache()
+    batch = cache.get(f"batch:{batch_key}")
+    if batch is not None:
+        return (batch_key,) + batch
+
+    parsed, report, todo = {}, {}, []
+    for (name, data), key in zip(items, keys):
+        hit = cache.get(key)
+        source = "메모리 캐시"
+        if hit is None:
+            hit = read_snapshot(key)
+            source = "스냅숏"
+            if hit is not None:
+                cache.put(key, hit, frame_nbytes(*hit))
+        if hit is None:
+            todo.append((name, data, key))
+        else:
+            parsed[key] = hit
+            report[key] = (source, 0.0, None)
+    results = parse_many([(name, data) for name, data, _ in todo])
+    for (name, _, key), (frames, error, seconds) in zip(todo, results):
+        if frames is not None:
+            frames = (to_snapshot_frame(frames[0]), None if frames[1] is None else to_snapshot_frame(frames[1]))
+            write_snapshot(key, *frames)
+            cache.put(key, frames, frame_nbytes(*frames))
+            parsed[key] = frames
+        report[key] = ("파싱" if error is None else "오류", round(seconds, 3), error)
+
+    loaded = [(name, key) for (name, _), key in zip(items, keys) if key in parsed]
+    findings = None
+    if loaded:
+        findings = pd.concat(
+            [parsed[key][0].assign(**{SOURCE_COLUMN: name}) for name, key in loaded],
+            ignore_index=True,
+        )
+    standards = next((parsed[key][1] for _, key in loaded if parsed[key][1] is not None), None)
+    load_report = pd.DataFrame(
+        [(name, len(parsed[key][0]) if key in parsed else 0, *report[key]) for (name, _), key in zip(items, keys)],
+        columns=["파일", "행 수", "로드", "파싱(초)", "오류"],
+    )
+    batch = (findings, standards, load_report)
+    if findings is not None:
+        cache.put(f"batch:{batch_key}", batch, frame_nbytes(findings))
+    return (batch_key,) + batch
+
+# ----------------- 다운로드 캐시 -----------------
+EXPORT_CACHE_MAX_ENTRIES = 16
+EXPORT_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+@st.cache_resource
+def get_export_cache():
+    return LRUCache(EXPORT_CACHE_MAX_ENTRIES, EXPORT_CACHE_MAX_BYTES)
+
+def filter_state_key(workbook_key, row_mask):
+    """워크북 + 필터 결과(행 마스크) 해시 — 같은 결과면 같은 키"""
+    return hashlib.sha1(workbook_key.encode() + np.packbits(row_mask).tobytes()).hexdigest()
+
+def lazy_export(cache_key, build):
+    """다운로드 버튼용 callable — 클릭할 때만 build() 실행, 결과는 cache_key로 재사용"""
+    def data():
+        cache = get_export_cache()
+        payload = cache.get(cache_key)
+        if payload is None:
+            payload = build()
+            cache.put(cache_key, payload, len(payload))
+        return payload
+    return data
+
+@st.cache_resource(max_entries=8, show_spinner=False)
+def prepare_findings(workbook_key, _findings, _standards):
+    """노이즈 컬럼 제거 → 요구사항 매칭 → 메모리 압축 (워크북당 1회)
+
+    결과 DataFrame은 모든 세션이 공유하므로 수정하지 말고 새 객체로 다룰 것
+    """
+    return prepare(_findings, _standards)
+
+# ----------------- 차트 캐시 -----------------
+FIGURE_CACHE_MAX_ENTRIES = 64
+FIGURE_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+@st.cache_resource
+def get_figure_cache():
+    return LRUCache(FIGURE_CACHE_MAX_ENTRIES, FIGURE_CACHE_MAX_BYTES)
+
+def cached_figure(kind, table, build):
+    """집계표 내용 해시로 Plotly figure 재사용 — 건수가 같으면 build(table)를 다시 호출하지 않음"""
+    fingerprint = pd.util.hash_pandas_object(table, index=False).values.tobytes()
+    key = hashlib.sha1(kind.encode() + b"\0" + "\0".join(map(str, table.columns)).encode() + fingerprint).hexdigest()
+    cache = get_figure_cache()
+    fig = cache.get(key)
+    if fig is None:
+        fig = build(table)
+        cache.put(key, fig, frame_nbytes(table))
+    return fig
+
+def clause_bar(table):
+    return px.bar(table, x="조항", y="건수", text="건수", title="조항별 발생 건수")
+
+def sub_clause_bar(table):
+    # 모든 세부조항 라벨 표시 & 회전
+    fig = px.bar(table, x="세부조항", y="건수", text="건수", title="세부조항별 발생 건수")
+    fig.update_xaxes(tickangle=60, tickmode='array', tickvals=table["세부조항"], ticktext=table["세부조항"])
+    return fig
+
+def category_pie(table):
+    return px.pie(table, names="구분", values="건수", title="권고/부적합 비율")
 
 # ----------------- 데이터 로드 -----------------
-uploaded = st.file_uploader("엑셀 파일 업로드 (선택)", type=["xlsx"])
-if uploaded:
-    findings = pd.read_excel(uploaded, sheet_name=0)
-    try:
-        standards = pd.read_excel(uploaded, sheet_name=1)
-    except:
-        standards = DEFAULT_STANDARDS
-else:
-    st.info("⚠️ 업로드하지 않으면 샘플 데이터를 사용합니다.")
-    findings, standards = DEFAULT_FINDINGS.copy(), DEFAULT_STANDARDS.copy()
-
-findings = drop_noise_columns(findings)
-findings = add_req_text(findings, standards)
-
-# ----------------- 검색 조건 -----------------
-st.sidebar.header("🔍 검색 조건")
-조항_sel = st.sidebar.multiselect("조항", sorted(findings["조항"].dropna().astype(str).unique()) if "조항" in findings else [])
-세부조항_sel = st.sidebar.multiselect("세부조항", sorted(findings["세부조항"].dropna().astype(str).unique()) if "세부조항" in findings else [])
-구분_sel = st.sidebar.multiselect("구분 (부적합/권고)", sorted(findings["구분"].dropna().astype(str).unique()) if "구분" in findings else [])
-키워드 = st.sidebar.text_input("내용 검색")
-조항검색 = st.sidebar.text_input("조항 검색 (예: 7 또는 7.1)")
-if st.sidebar.button("검색조건 초기화"):
-    st.rerun()
-btn_search = st.sidebar.button("🔍 검색 실행")
+def load_data():
+    """업로드(또는 샘플) → (workbook_key, 정리된 findings, standards) — 업로드가 바뀌면 전체 재실행"""
+    uploaded = st.file_uploader(
+        "엑셀 파일 업로드 (선택, 여러 개 또는 zip 가능)",
+        type=["xlsx", "parquet", "zip"],
+        accept_multiple_files=True,
+    )
+    if uploaded:
+        workbook_key, findings, standards, load_report = load_workbooks(uploaded)
+        with st.expander(f"📂 파일별 로드 결과 ({len(load_report)}개)"):
+            st.dataframe(load_report, hide_index=True, width="stretch")
+        if findings is None:
+            st.error("읽을 수 있는 파일이 없습니다. 파일별 로드 결과를 확인하세요.")
+            st.stop()
+        if standards is None:
+            standards = DEFAULT_STANDARDS
+    else:
+        st.info("⚠️ 업로드하지 않으면 샘플 데이터를 사용합니다.")
+        workbook_key = "sample"
+        findings, standards = DEFAULT_FINDINGS, DEFAULT_STANDARDS
+    findings = prepare_findings(workbook_key, findings, standards)
+    if uploaded and st.button("📦 누적 저장소에 추가 (중복 행 제외)"):
+        with st.spinner("저장소에 추가하고 명사 색인을 만드는 중..."):
+            added, duplicates = get_warehouse().append(findings, workbook_key)
+        if added or duplicates:
+            st.success(f"{added:,}건 추가 · 중복 {duplicates:,}건 제외")
+        else:
+            st.info("이미 누적 저장소에 추가한 업로드입니다.")
+    return workbook_key, findings, standards
 
 # ----------------- 필터링 -----------------
-df = findings.copy()
-if btn_search or any([조항_sel, 세부조항_sel, 구분_sel, 키워드, 조항검색]):
-    if "조항" in df and 조항_sel:
-        df = df[df["조항"].astype(str).isin(조항_sel)]
-    if "세부조항" in df and 세부조항_sel:
-        df = df[df["세부조항"].astype(str).isin(세부조항_sel)]
-    if "구분" in df and 구분_sel:
-        df = df[df["구분"].astype(str).isin(구분_sel)]
-    if "내용" in df and 키워드:
-        df = df[df["내용"].astype(str).str.contains(키워드, case=False, na=False)]
-    if 조항검색:
-        mask = pd.Series(False, index=df.index)
-        if "조항" in df:
-            mask |= df["조항"].astype(str).str.contains(조항검색, na=False)
-        if "세부조항" in df:
-            mask |= df["세부조항"].astype(str).str.contains(조항검색, na=False)
-        df = df[mask]
-
-st.markdown("### 🔎 검색 결과")
-st.dataframe(
-    df[[c for c in ["조항","세부조항","구분","요구사항","내용"] if c in df.columns]],
-    use_container_width=True
-)
+# 텍스트 검색은 입력을 멈춘 뒤 이 간격이 지나야 반영 ("off"면 Enter/포커스 이동 시에만)
+SEARCH_DEBOUNCE = os.environ.get("FINDINGS_SEARCH_DEBOUNCE", "300ms")
+SEARCH_LIVE = False if SEARCH_DEBOUNCE.strip().lower() in ("", "off") else SEARCH_DEBOUNCE
+MASK_CACHE_MAX_ENTRIES = 256
+MASK_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+@st.cache_resource
+def get_mask_cache():
+    """(워크북, 정규화한 검색 조건) → 행 마스크 — 지웠다 다시 친 검색어는 다시 계산하지 않음"""
+    return LRUCache(MASK_CACHE_MAX_ENTRIES, MASK_CACHE_MAX_BYTES)
+
+def query_key(query):
+    """선택 순서·앞뒤 공백이 달라도 같은 조건이면 같은 키 (안쪽 공백은 "구문" 검색에서 의미가 있으므로 유지)"""
+    return tuple(
+        (name, tuple(sorted(map(str, value))) if isinstance(value, list) else value.strip())
+        for name, value in sorted(query.items())
+    )
+
+def filter_rows(workbook_key, findings, standards, query, force=False):
+    """검색 조건 → findings 행 순서 기준 bool 마스크 (조건이 없으면 전체, 읽기 전용)
 
-# ----------------- 엑셀 다운로드 -----------------
-if not df.empty:
-    buffer = BytesIO()
-    df.to_excel(buffer, index=False)
-    st.download_button(
-        label="📥 현재 검색 결과 엑셀 다운로드",
-        data=buffer.getvalue(),
-        file_name="filtered_findings.xlsx",
-        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    query: {"조항", "세부조항", "구분": 선택값 목록, "키워드", "조항검색": 문자열}
+    """
+    cache_key = (workbook_key, query_key(query) if (force or any(query.values())) else ())
+    cache = get_mask_cache()
+    row_mask = cache.get(cache_key)
+    if row_mask is None:
+        row_mask = _compute_mask(workbook_key, findings, standards, query) if cache_key[1] else np.ones(len(findings), dtype=bool)
+        row_mask.flags.writeable = False
+        cache.put(cache_key, row_mask, row_mask.nbytes)
+    return row_mask
+
+def _compute_mask(workbook_key, findings, standards, query):
+    if USE_DUCKDB:
+        return get_duckdb_backend(workbook_key, findings, standards).filter_mask(query)
+    row_mask = get_filter_index(workbook_key, findings).select(
+        {"조항": query["조항"], "세부조항": query["세부조항"], "구분": query["구분"]}
+    )
+    if "내용" in findings and query["키워드"]:
+        keyword_mask = get_text_index(workbook_key, findings["내용"]).search(query["키워드"])
+        if keyword_mask is not None:
+            row_mask &= keyword_mask
+    if query["조항검색"]:
+        clause_mask = get_clause_trie(workbook_key, findings).search(query["조항검색"])
+        if clause_mask is not None:
+            row_mask &= clause_mask
+    return row_mask
+
+def stats_tables(workbook_key, findings, standards, query, row_mask):
+    """차원별 [값, 건수] 표 dict
+
+    pandas: 조항/세부조항/구분 선택만 있으면 큐브 슬라이스, 텍스트 검색이 섞이면 선택 행만 셀별 집계
+    duckdb: 같은 조건을 SQL로 한 번에 집계
+    """
+    if USE_DUCKDB:
+        return get_duckdb_backend(workbook_key, findings, standards).count_tables(query)
+    stats_cube = get_stats_cube(workbook_key, findings)
+    if query["키워드"] or query["조항검색"]:
+        cube_counts = stats_cube.cell_counts(row_mask)
+    else:
+        cube_counts = stats_cube.slice({"조항": query["조항"], "세부조항": query["세부조항"], "구분": query["구분"]})
+    return {dim: stats_cube.marginal(dim, cube_counts) for dim in stats_cube.dims}
+
+# ----------------- 화면 구성 -----------------
+# 섹션은 필요한 데이터를 인자로만 주고받음: 로드 → 검색 조건 → (결과표, 통계, 명사 분석)
+# 검색 조건을 바꾸면 results_section만, 정렬·페이지 이동은 result_table만 다시 실행
+# 프래그먼트 안의 위젯으로 시작된 재실행은 진행 중인 실행을 중단하지 않고 그 실행이 끝날 때까지 기다림
+# → 화면 실행 안에서는 캐시된 색인으로 끝나는 계산만 하고, 명사 행렬 생성은 백그라운드 작업으로 넘김
+PAGE_SIZES = [25, 50, 100, 200]
+RESULT_COLUMNS = ["조항", "세부조항", "구분", "요구사항", "내용", SOURCE_COLUMN]
+DATA_SOURCES = ["업로드 / 샘플", "누적 저장소"]
+
+def search_widgets(options):
+    """사이드바 검색 조건 위젯 → (query dict, 검색 실행 버튼 눌림)"""
+    query = {
+        "조항": st.sidebar.multiselect("조항", options.get("조항", [])),
+        "세부조항": st.sidebar.multiselect("세부조항", options.get("세부조항", [])),
+        "구분": st.sidebar.multiselect("구분 (부적합/권고)", options.get("구분", [])),
+        "키워드": st.sidebar.text_input(
+            "내용 검색", help='공백 = AND, | = OR, "따옴표" = 구문 그대로 검색', live=SEARCH_LIVE
+        ),
+        "조항검색": st.sidebar.text_input("조항 검색 (예: 7 또는 7.1)", live=SEARCH_LIVE),
+    }
+    if st.sidebar.button("검색조건 초기화"):
+        st.rerun()
+    return query, st.sidebar.button("🔍 검색 실행")
+
+def page_controls(result_cols, n_results):
+    """정렬·페이지 위젯 → (정렬 컬럼 또는 None, 내림차순, 페이지, 페이지 크기, 전체 페이지 수)"""
+    col_sort, col_desc, col_size, col_page = st.columns([2, 1, 1, 1], vertical_alignment="bottom")
+    sort_col = col_sort.selectbox("정렬 기준", ["(원래 순서)"] + result_cols)
+    descending = col_desc.checkbox("내림차순")
+    page_size = col_size.selectbox("페이지 크기", PAGE_SIZES, index=1)
+    n_pages = max(1, -(-n_results // page_size))
+    if st.session_state.get("result_page", 1) > n_pages:
+        st.session_state["result_page"] = n_pages
+    page = col_page.number_input("페이지", min_value=1, max_value=n_pages, step=1, key="result_page")
+    return (sort_col if sort_col in result_cols else None), descending, page, page_size, n_pages
+
+def download_results(export_key, build):
+    """다운로드 형식 선택 + 버튼 — build(형식)는 버튼을 눌렀을 때만 실행 (검색/탐색 중에는 비용 없음)"""
+    col_fmt, col_btn = st.columns([1, 4], vertical_alignment="bottom")
+    export_fmt = col_fmt.selectbox("다운로드 형식", list(EXPORT_FORMATS))
+    ext, mime, _ = EXPORT_FORMATS[export_fmt]
+    col_btn.download_button(
+        label="📥 현재 검색 결과 다운로드",
+        data=lazy_export(f"{export_key}:findings.{ext}", lambda fmt=export_fmt: build(fmt)),
+        file_name=f"filtered_findings.{ext}",
+        mime=mime,
+        on_click="ignore",
     )
 
-# ----------------- 통계 및 인사이트 -----------------
-st.markdown("## 📊 통계 분석 및 인사이트")
-if not df.empty:
+@st.fragment
+def results_section(workbook_key, findings, standards):
+    """사이드바 검색 조건 + 그에 따르는 결과표·통계·명사 분석"""
+    query, btn_search = search_widgets(get_filter_index(workbook_key, findings).options)
+
+    row_mask = filter_rows(workbook_key, findings, standards, query, force=btn_search)
+    export_key = filter_state_key(workbook_key, row_mask)
+    result_table(workbook_key, findings, row_mask, export_key)
+    stats_section(workbook_key, findings, standards, query, row_mask, export_key)
+    noun_section(workbook_key, findings, row_mask)
+
+@st.fragment
+def result_table(workbook_key, findings, row_mask, export_key):
+    """검색 결과표 + 다운로드 — 정렬·페이지 나누기는 서버에서 처리하고 현재 페이지 행만 전송"""
+    st.markdown("### 🔎 검색 결과")
+    result_cols = [c for c in RESULT_COLUMNS if c in findings.columns]
+    sort_ranks = get_sort_ranks(workbook_key, findings, tuple(result_cols))
+
+    sort_col, descending, page, page_size, n_pages = page_controls(result_cols, int(row_mask.sum()))
+    page_ids, n_results = page_rows(row_mask, page, page_size, sort_ranks.get(sort_col), descending)
+    st.dataframe(findings.iloc[page_ids][result_cols], width="stretch")
+    st.caption(f"총 {n_results:,}건 · {page}/{n_pages} 페이지")
+
+    if n_results:
+        download_results(export_key, lambda fmt: export_bytes(findings[row_mask], fmt))
+
+@st.fragment
+def stats_section(workbook_key, findings, standards, query, row_mask, export_key):
+    """📊 통계 — 조항/세부조항/구분별 건수 (stats_tables)"""
+    st.markdown("## 📊 통계 분석 및 인사이트")
+    if not row_mask.any():
+        return
+    render_stats(stats_tables(workbook_key, findings, standards, query, row_mask), export_key)
+
+def render_stats(tables, export_key):
+    """차원별 [값, 건수] 표 → 차트·TOP5·세부조항 다운로드 (업로드·누적 저장소 공통)"""
     # --- 조항별 건수 ---
-    if "조항" in df:
+    if "조항" in tables:
         st.markdown("#### 1️⃣ 조항별 발생 건수")
-        c1 = df["조항"].astype(str).value_counts().reset_index()
-        c1.columns = ["조항","건수"]
-        st.plotly_chart(px.bar(c1, x="조항", y="건수", text="건수", title="조항별 발생 건수"), use_container_width=True)
+        c1 = tables["조항"]
+        st.plotly_chart(cached_figure("조항", c1, clause_bar), width="stretch")
         st.markdown("**🔝 TOP 5 많이 발생한 조항**")
         st.table(c1.head(5))
 
     # --- 세부조항별 건수 ---
-    if "세부조항" in df:
+    if "세부조항" in tables:
         st.markdown("#### 2️⃣ 세부조항별 발생 건수")
-        c2 = df["세부조항"].astype(str).value_counts().reset_index()
-        c2.columns = ["세부조항","건수"]
+        c2 = tables["세부조항"]
 
-        # Plotly 그래프 (모든 세부조항 라벨 표시 & 회전)
-        fig2 = px.bar(c2, x="세부조항", y="건수", text="건수", title="세부조항별 발생 건수")
-        fig2.update_xaxes(tickangle=60, tickmode='array', tickvals=c2["세부조항"], ticktext=c2["세부조항"])
-        st.plotly_chart(fig2, use_container_width=True)
+        st.plotly_chart(cached_figure("세부조항", c2, sub_clause_bar), width="stretch")
 
         # --- 세부조항 TOP5를 엑셀로 다운로드 ---
-        buf_excel = BytesIO()
-        c2.to_excel(buf_excel, index=False)
         st.download_button(
             label="📥 세부조항별 발생 건수 엑셀 다운로드",
-            data=buf_excel.getvalue(),
+            data=lazy_export(f"{export_key}:세부조항.xlsx", lambda frame=c2: export_bytes(frame, "xlsx")),
             file_name="세부조항별_발생건수.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            mime=EXPORT_FORMATS["xlsx"][1],
+            on_click="ignore",
         )
 
         st.markdown("**🔝 TOP 5 세부조항**")
         st.table(c2.head(5))
 
     # --- 구분 비율 ---
-    if "구분" in df:
+    if "구분" in tables:
         st.markdown("#### 3️⃣ 권고 / 부적합 비율")
-        st.plotly_chart(px.pie(df, names="구분", title="권고/부적합 비율"), use_container_width=True)
-
-    # --- 키워드 명사 빈도 분석 ---
-    if okt_available and "내용" in df:
-        st.markdown("#### 4️⃣ 자주 등장하는 명사 TOP10")
-        nouns = extract_nouns(df["내용"])
-        if not nouns.empty:
-            freq = nouns.value_counts().head(10)
-            st.bar_chart(freq)
-            st.caption("※ 한국어 문장에서 명사만 추출하여 단순 빈도 분석")
+        c3 = tables["구분"]
+        st.plotly_chart(cached_figure("구분", c3, category_pie), width="stretch")
+
+NOUN_POLL_SECONDS = 0.5
+
+@st.fragment
+def noun_section(workbook_key, findings, row_mask):
+    """4️⃣ 명사 TOP10 — 명사 행렬은 백그라운드에서 워크북별 1회 생성, 끝나기 전에는 안내문만 두고 실행을 마침"""
+    has_rows = row_mask.any()
+    if not noun_backend_available():
+        if has_rows:
+            st.info(f"⚠️ 명사 분석기 '{NOUN_BACKEND}' 모듈이 없어 명사 빈도 분석 기능은 사용할 수 없습니다.")
+        return
+    if not has_rows or "내용" not in findings:
+        return
+    st.markdown("#### 4️⃣ 자주 등장하는 명사 TOP10")
+    jobs = get_noun_jobs()
+    job = jobs.get(workbook_key)
+    if job is None:
+        # 모든 문장이 NounStore에 있으면 분석기(JVM) 없이 바로 생성, 누락이 있을 때만 백그라운드에서 분석기를 띄움
+        matrix = NounMatrix.from_texts(findings["내용"], cached_only=True)
+        if matrix is not None:
+            job = jobs.put(workbook_key, matrix)
         else:
-            st.info("konlpy 모듈이 없어 명사 분석을 건너뜁니다.")
-    elif not okt_available:
-        st.info("⚠️ konlpy 모듈이 없어 명사 빈도 분석 기능은 사용할 수 없습니다.")
-
+            job = jobs.submit(workbook_key, NounMatrix.from_texts, findings["내용"])
+    if not job.done():
+        st.info(f"⏳ 형태소 분석기({NOUN_BACKEND})로 명사를 분석 중입니다. 끝나면 자동으로 표시됩니다.")
+        wait_for_job(job)
+        return
+    if job.exception() is not None:  # Java 미설치, Mecab 사전 없음 등
+        st.warning(f"형태소 분석기를 시작하지 못했습니다: {job.exception()}")
+        return
+    render_noun_freq(job.result().top(row_mask, 10), NOUN_BACKEND)
+
+@st.fragment(run_every=NOUN_POLL_SECONDS)
+def wait_for_job(job):
+    """작업 완료 여부만 주기적으로 확인 — 끝나면 앱을 다시 실행 (검색 마스크·통계는 캐시에서 재사용)"""
+    if job.done():
+        st.rerun()
+
+def render_noun_freq(freq, analyzer):
+    """명사 빈도 Series → 막대 차트 (업로드·누적 저장소 공통)"""
+    if freq.empty:
+        st.info("검색 결과 문장에서 추출된 명사가 없습니다.")
+        return
+    st.bar_chart(freq)
+    st.caption(f"※ 한국어 문장에서 명사만 추출하여 단순 빈도 분석 (분석기: {analyzer})")
+
+@st.fragment
+def noun_benchmark(workbook_key, text_series):
+    """사이드바: 불러온 '내용' 표본으로 설치된 명사 분석기 처리량 비교 (버튼을 눌렀을 때만 실행)"""
+    state_key = f"noun_benchmark:{workbook_key}"
+    with st.sidebar.expander("⏱️ 명사 분석기 벤치마크"):
+        st.caption(f"현재 분석기: {NOUN_BACKEND} (FINDINGS_NOUN_BACKEND로 변경)")
+        sample = st.number_input("표본 문장 수", 50, 20_000, NOUN_BENCH_SAMPLE, step=50)
+        if st.button("측정", key="noun_benchmark"):
+            with st.spinner("측정 중..."):
+                st.session_state[state_key] = benchmark_noun_backends(text_series, sample=int(sample))
+        if state_key in st.session_state:
+            st.dataframe(st.session_state[state_key], hide_index=True)
+
+# ----------------- 누적 저장소 화면 -----------------
+WAREHOUSE_NOUN_CACHE_MAX_ENTRIES = 256
+WAREHOUSE_NOUN_CACHE_MAX_BYTES = 16 * 1024 * 1024
+
+# 검색·정렬·페이지·통계를 모두 SQL로 처리 — 저장소 전체를 메모리에 올리거나 다시 파싱하지 않음
+@st.fragment
+def warehouse_section(warehouse):
+    """누적 저장소 검색 조건 + 결과표·통계·명사 분석"""
+    query, _ = search_widgets(warehouse.options())
+    cells = warehouse.cells(query)
+    n_results = int(cells["n"].sum())
+    export_key = hashlib.sha1(repr(("warehouse", warehouse.version(), query_key(query))).encode()).hexdigest()
+    warehouse_table(warehouse, query, n_results, export_key)
+    st.markdown("## 📊 통계 분석 및 인사이트")
+    if n_results:
+        render_stats(warehouse.count_tables(cells=cells), export_key)
+    if n_results:
+        warehouse_nouns(warehouse, query)
+
+def warehouse_nouns(warehouse, query):
+    """누적 저장소 명사 TOP10 — 적재할 때 만든 명사 색인을 SQL로 집계 (행을 읽거나 형태소 분석하지 않음)
+
+    넓은 텍스트 검색은 집계에 수백 ms가 걸리므로 (저장소 버전, 명사 색인 버전, 검색 조건)별로 재사용
+    """
+    cache_key = (warehouse.version(), warehouse.noun_version(), query_key(query))
+    cache = get_warehouse_noun_cache()
+    freq = cache.get(cache_key)
+    if freq is None:
+        freq = warehouse.top_nouns(query, 10)
+        if freq is not None:
+            cache.put(cache_key, freq, int(freq.memory_usage(deep=True)))
+    st.markdown("#### 4️⃣ 자주 등장하는 명사 TOP10")
+    if freq is None:
+        st.info("누적 저장소에 명사 색인이 없습니다. 명사 분석기를 설치한 뒤 python warehouse.py nouns로 색인하세요.")
+        return
+    render_noun_freq(freq, warehouse.noun_version())
+
+@st.cache_resource
+def get_warehouse_noun_cache():
+    return LRUCache(WAREHOUSE_NOUN_CACHE_MAX_ENTRIES, WAREHOUSE_NOUN_CACHE_MAX_BYTES)
+
+@st.fragment
+def warehouse_table(warehouse, query, n_results, export_key):
+    """누적 저장소 결과표 — 현재 페이지 행만 SQL로 읽음"""
+    st.markdown("### 🔎 검색 결과")
+    sort_col, descending, page, page_size, n_pages = page_controls(RESULT_COLUMNS, n_results)
+    st.dataframe(warehouse.page(query, page, page_size, sort_col, descending)[RESULT_COLUMNS], width="stretch")
+    st.caption(f"총 {n_results:,}건 · {page}/{n_pages} 페이지")
+    if n_results:
+        download_results(export_key, lambda fmt: export_bytes(warehouse.rows(query), fmt))
+
+# ----------------- 페이지 -----------------
+def main():
+    st.set_page_config(page_title="인정평가 부적합 분석(ISO/IEC 17021-1 기반)", layout="wide")
+    render_header()
+    render_guide()
+    st.markdown("---")
+    if QUERY_BACKEND == "duckdb" and not duckdb_available:
+        st.info("⚠️ duckdb 모듈이 없어 pandas로 검색·집계합니다.")
+    source = st.radio("분석 대상", DATA_SOURCES, horizontal=True)
+    if source == "누적 저장소":
+        warehouse = get_warehouse()
+        rows, _ = warehouse.version()
+        if not rows:
+            st.info("⚠️ 누적 저장소가 비어 있습니다. 업로드 후 '누적 저장소에 추가'를 누르거나 warehouse.py add로 적재하세요.")
+            return
+        st.caption(f"누적 저장소: 총 {rows:,}건")
+        st.sidebar.header("🔍 검색 조건")
+        warehouse_section(warehouse)
+        return
+    workbook_key, findings, standards = load_data()
+    # 프래그먼트가 사이드바에 쓰려면 전체 실행에서 사이드바에 먼저 한 번 써야 함
+    st.sidebar.header("🔍 검색 조건")
+    results_section(workbook_key, findings, standards)
+    if "내용" in findings:
+        noun_benchmark(workbook_key, findings["내용"])
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""워크북 폴더 일괄 분석 — 파일마다 검색 결과 / 건수 / 명사 TOP 표를 내보냄 (브라우저 불필요)
+
+사용법: python batch.py 입력폴더 출력폴더 [--구분 부적합] [--keyword "심사 | 기록"] [--format csv] [--workers 8]
+
+입력폴더 아래의 xlsx / parquet / zip을 모두 찾아 프로세스 풀에서 파일 단위로 동시에 분석하고,
+출력폴더에 파일별 <이름>.results / .counts / .nouns 와 전체 합계 _counts / _nouns, 실행 요약 _summary.csv를 씀
+"""
+import argparse
+import multiprocessing
+import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from engine import (
+    NOUN_BACKEND, NOUN_BACKENDS, QUERY_BACKENDS, analyze, duckdb_available, extract_nouns, noun_backend_available,
+)
+from exporter import EXPORT_FORMATS, write_frame
+from ingest import INGEST_SUFFIXES, expand_uploads, parse_workbook
+
+BATCH_WORKERS = os.cpu_count() or 1
+
+def find_workbooks(root):
+    """폴더 아래 분석 대상 파일 (엑셀 잠금 파일 ~$ 제외, 경로 순)"""
+    suffixes = INGEST_SUFFIXES + (".zip",)
+    return sorted(p for p in Path(root).rglob("*")
+                  if p.is_file() and p.suffix.lower() in suffixes and not p.name.startswith("~$"))
+
+def output_stem(root, path, member=None):
+    """입력 경로 → 출력 파일 이름 (하위 폴더·zip 내부 경로는 __로 이어 붙여 충돌 방지)"""
+    parts = list(path.relative_to(root).with_suffix("").parts)
+    if member:
+        parts.extend(Path(member).with_suffix("").parts)
+    return "__".join(parts)
+
+def long_counts(tables):
+    """{차원: [값, 건수]} → [차원, 값, 건수] 한 표"""
+    frames = [t.rename(columns={dim: "값"}).assign(차원=dim) for dim, t in tables.items()]
+    if not frames:
+        return pd.DataFrame(columns=["차원", "값", "건수"])
+    return pd.concat(frames, ignore_index=True)[["차원", "값", "건수"]]
+
+def noun_table(counter, top):
+    """명사 Counter → [명사, count] TOP n 표 (동률은 명사 이름 순)"""
+    freq = pd.Series(counter, name="count", dtype=np.int64).rename_axis("명사").sort_index()
+    return freq.sort_values(ascending=False, kind="stable").head(top).reset_index()
+
+def process_workbook(task):
+    """(입력 루트, 파일 경로, 출력 폴더, 옵션) → 요약 행 목록 — 프로세스 풀 작업 단위"""
+    root, path, out_dir, options = task
+    items = [(path.name, path.read_bytes())]
+    if path.suffix.lower() == ".zip":
+        items = expand_uploads(items)
+    ext = EXPORT_FORMATS[options["format"]][0]
+    summary = []
+    for name, data in items:
+        member = name if path.suffix.lower() == ".zip" else None
+        stem = output_stem(root, path, member)
+        started = time.perf_counter()
+        row = {"파일": stem, "행 수": 0, "검색 결과": 0, "초": 0.0, "오류": None, "counts": None, "nouns": None}
+        try:
+            findings, standards = parse_workbook(data, name)
+            if standards is None:
+                standards = options["standards"]
+            matched, tables, _ = analyze(findings, standards, options["query"], top_nouns=0, backend=options["backend"])
+            counts = long_counts(tables)
+            write_frame(matched, out_dir / f"{stem}.results.{ext}", options["format"])
+            write_frame(counts, out_dir / f"{stem}.counts.{ext}", options["format"])
+            row.update({"행 수": len(findings), "검색 결과": len(matched), "counts": counts})
+            if options["top_nouns"] and noun_backend_available(options["noun_backend"]) and "내용" in matched:
+                # 전체 합계는 파일별 TOP n이 아니라 전체 빈도를 더해야 하므로 Counter를 통째로 돌려줌
+                nouns = extract_nouns(matched["내용"], workers=1, backend=options["noun_backend"])
+                table = noun_table(nouns, options["top_nouns"])
+                write_frame(table, out_dir / f"{stem}.nouns.{ext}", options["format"])
+                row["nouns"] = nouns
+        except Exception as e:  # 손상된 파일 등은 건너뛰고 요약에 보고
+            row["오류"] = f"{type(e).__name__}: {e}"
+        row["초"] = round(time.perf_counter() - started, 3)
+        summary.append(row)
+    return summary
+
+def run_batch(root, out_dir, options, workers=BATCH_WORKERS, progress=print):
+    """폴더 일괄 분석 → 요약 DataFrame (파일 단위로 프로세스 풀에 분배)"""
+    root, out_dir = Path(root), Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    paths = find_workbooks(root)
+    tasks = [(root, path, out_dir, options) for path in paths]
+    rows = []
+    if workers <= 1 or len(tasks) <= 1:
+        results = map(process_workbook, tasks)
+        for done, result in enumerate(results, start=1):
+            rows.extend(result)
+            progress(f"[{done}/{len(tasks)}] {result[0]['파일'] if result else ''}")
+    else:
+        # 각 프로세스가 자기 JVM(Okt)을 가지므로 파일 단위 병렬이 코어를 모두 사용
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks)), mp_context=context) as pool:
+            futures = [pool.submit(process_workbook, task) for task in tasks]
+            for done, future in enumerate(as_completed(futures), start=1):
+                result = future.result()
+                rows.extend(result)
+                progress(f"[{done}/{len(tasks)}] {result[0]['파일'] if result else ''}")
+    return write_totals(rows, out_dir, options["format"], options["top_nouns"])
+
+def write_totals(rows, out_dir, fmt, top_nouns=10):
+    """파일별 건수 표·명사 빈도를 합산해 _counts / _nouns(TOP n), 실행 요약 _summary.csv 기록"""
+    ext = EXPORT_FORMATS[fmt][0]
+    counts = [r["counts"] for r in rows if r["counts"] is not None]
+    if counts:
+        total = pd.concat(counts).groupby(["차원", "값"], sort=False, observed=True)["건수"].sum()
+        # 차원은 조항 → 세부조항 → 구분 → 출처파일 순서 유지, 차원 안에서는 건수 내림차순
+        dim_order = {dim: i for i, dim in enumerate(dict.fromkeys(total.index.get_level_values("차원")))}
+        total = total.reset_index().sort_values(
+            ["차원", "건수"], key=lambda col: col.map(dim_order) if col.name == "차원" else -col, kind="stable"
+        )
+        write_frame(total, out_dir / f"_counts.{ext}", fmt)
+    nouns = [r["nouns"] for r in rows if r["nouns"] is not None]
+    if nouns:
+        total = Counter()
+        for counter in nouns:
+            total.update(counter)
+        write_frame(noun_table(total, top_nouns), out_dir / f"_nouns.{ext}", fmt)
+    summary = pd.DataFrame(
+        [{k: v for k, v in r.items() if k not in ("counts", "nouns")} for r in rows],
+        columns=["파일", "행 수", "검색 결과", "초", "오류"],
+    ).sort_values("파일", kind="stable")
+    write_frame(summary, out_dir / "_summary.csv", "csv")
+    return summary
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("input", help="워크북 폴더 (하위 폴더 포함)")
+    parser.add_argument("output", help="결과를 쓸 폴더")
+    parser.add_argument("--조항", dest="clause", nargs="+", default=[], help="조항 선택 (여러 개 = OR)")
+    parser.add_argument("--세부조항", dest="sub_clause", nargs="+", default=[], help="세부조항 선택")
+    parser.add_argument("--구분", dest="kind", nargs="+", default=[], help="부적합 / 권고")
+    parser.add_argument("--keyword", default="", help='내용 검색 (공백 = AND, | = OR, "따옴표" = 구문)')
+    parser.add_argument("--clause-search", default="", help="조항 검색 (예: 7 또는 7.1)")
+    parser.add_argument("--standards", help="워크북에 기준 시트가 없을 때 사용할 기준 xlsx")
+    parser.add_argument("--top-nouns", type=int, default=10, help="명사 TOP n (0 = 생략)")
+    parser.add_argument("--format", choices=list(EXPORT_FORMATS), default="xlsx")
+    parser.add_argument("--backend", choices=QUERY_BACKENDS, default="pandas", help="검색·집계 실행 엔진")
+    parser.add_argument("--noun-backend", choices=list(NOUN_BACKENDS), default=NOUN_BACKEND,
+                        help="명사 분석기 (mecab / kiwi / okt = 형태소 분석기, simple / ngram = 순수 Python)")
+    parser.add_argument("--workers", type=int, default=BATCH_WORKERS)
+    args = parser.parse_args()
+    if args.backend == "duckdb" and not duckdb_available:
+        parser.error("duckdb 모듈이 없습니다 (pip install duckdb)")
+    if not noun_backend_available(args.noun_backend):
+        parser.error(f"명사 분석기 '{args.noun_backend}' 모듈이 없습니다 (--noun-backend simple 사용 가능)")
+
+    standards = None
+    if args.standards:
+        standards = parse_workbook(Path(args.standards).read_bytes(), args.standards)[0]
+    options = {
+        "query": {
+            "조항": args.clause, "세부조항": args.sub_clause, "구분": args.kind,
+            "키워드": args.keyword, "조항검색": args.clause_search,
+        },
+        "standards": standards,
+        "top_nouns": args.top_nouns,
+        "format": args.format,
+        "backend": args.backend,
+        "noun_backend": args.noun_backend,
+    }
+    started = time.perf_counter()
+    summary = run_batch(args.input, args.output, options, args.workers)
+    failed = summary["오류"].notna().sum()
+    print(f"{len(summary):,}개 워크북, 오류 {failed}개, {time.perf_counter() - started:.1f}초 → {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""내보내기 형식별 쓰기 시간 / 최대 메모리 비교
+
+사용법: python bench_export.py --rows 200000 [--json bench_export.json]
+"""
+import argparse
+import json
+import time
+import tracemalloc
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+
+from exporter import EXPORT_FORMATS, write_frame
+
+def synthetic_frame(rows, seed=0):
+    """조항/세부조항/구분/요구사항/내용 형태의 임의 데이터"""
+    rng = np.random.default_rng(seed)
+    main = rng.integers(4, 11, rows)
+    sub = rng.integers(1, 10, rows)
+    words = np.array(["절차", "기록", "심사", "미흡", "관리", "검토", "계획", "역량", "문서", "변경"])
+    text = [" ".join(rng.choice(words, 8)) + "함." for _ in range(rows)]
+    return pd.DataFrame({
+        "조항": main.astype(str),
+        "세부조항": [f"{m}.{s}" for m, s in zip(main, sub)],
+        "구분": rng.choice(["부적합", "권고"], rows),
+        "요구사항": [f"조항 {m}.{s} 요구사항" for m, s in zip(main, sub)],
+        "내용": text,
+    })
+
+def _openpyxl_baseline(frame, target):
+    frame.to_excel(target, index=False, engine="openpyxl")
+
+def measure(writer, frame):
+    """(초, 최대 추적 메모리 MB, 결과 크기 MB)
+
+    tracemalloc이 실행 시간을 크게 늘리므로 시간과 메모리는 따로 측정
+    """
+    buffer = BytesIO()
+    started = time.perf_counter()
+    writer(frame, buffer)
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    writer(frame, BytesIO())
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 2**20, buffer.getbuffer().nbytes / 2**20
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--formats", nargs="+", default=["xlsx-openpyxl", *EXPORT_FORMATS])
+    parser.add_argument("--json", help="결과를 저장할 JSON 경로")
+    args = parser.parse_args()
+
+    frame = synthetic_frame(args.rows)
+    writers = {"xlsx-openpyxl": _openpyxl_baseline}
+    writers.update({fmt: (lambda f, t, fmt=fmt: write_frame(f, t, fmt)) for fmt in EXPORT_FORMATS})
+
+    results = []
+    print(f"rows={args.rows:,}")
+    print(f"{'format':<15}{'seconds':>10}{'peak MB':>10}{'size MB':>10}")
+    for fmt in args.formats:
+        seconds, peak_mb, size_mb = measure(writers[fmt], frame)
+        results.append({"format": fmt, "rows": args.rows, "seconds": round(seconds, 3),
+                        "peak_mb": round(peak_mb, 1), "size_mb": round(size_mb, 2)})
+        print(f"{fmt:<15}{seconds:>10.2f}{peak_mb:>10.1f}{size_mb:>10.2f}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fp:
+            json.dump(results, fp, ensure_ascii=False, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""명사 분석기 백엔드별 처리량 / 메모리 / 기준 분석기 대비 일치율 비교 (engine.NOUN_BACKENDS)
+
+사용법: python bench_nouns.py [워크북.xlsx ...] [--backends kiwi okt simple] [--reference okt] [--json bench_nouns.json]
+워크북을 주면 그 '내용' 컬럼, 없으면 bench_pipeline의 합성 문장으로 측정
+측정은 앱 사이드바와 같은 engine.benchmark_noun_backends (서로 다른 문장만, NounStore 캐시 없이)
+"""
+import argparse
+import json
+from collections import Counter
+from pathlib import Path
+
+import pandas as pd
+
+import engine
+from bench_pipeline import synthetic_findings
+from ingest import expand_uploads, parse_workbook
+
+def load_corpus(paths, rows, seed=0):
+    """'내용' 문장 Series (워크북 여러 개면 이어 붙임)"""
+    if not paths:
+        return synthetic_findings(rows, seed)["내용"]
+    texts = []
+    for name, data in expand_uploads([(Path(p).name, Path(p).read_bytes()) for p in paths]):
+        findings = parse_workbook(data, name)[0]
+        if "내용" in findings:
+            texts.append(findings["내용"])
+    return pd.concat(texts, ignore_index=True) if texts else pd.Series(dtype=object)
+
+def agreement(predicted, reference, top=20):
+    """문장별 명사 목록 두 벌 → 정밀도·재현율·F1(빈도 포함), 문장 평균 Jaccard, TOP n 겹침 비율"""
+    hit = n_pred = n_ref = 0
+    jaccard = []
+    pred_total, ref_total = Counter(), Counter()
+    for pred, ref in zip(predicted, reference):
+        pred_c, ref_c = Counter(pred), Counter(ref)
+        hit += sum((pred_c & ref_c).values())
+        n_pred += len(pred)
+        n_ref += len(ref)
+        union = set(pred) | set(ref)
+        jaccard.append(len(set(pred) & set(ref)) / len(union) if union else 1.0)
+        pred_total.update(pred)
+        ref_total.update(ref)
+    precision = hit / n_pred if n_pred else 0.0
+    recall = hit / n_ref if n_ref else 0.0
+    top_pred = {w for w, _ in pred_total.most_common(top)}
+    top_ref = {w for w, _ in ref_total.most_common(top)}
+    return {
+        "precision": round(precision, 4),
+        "recall": round(recall, 4),
+        "f1": round(2 * precision * recall / (precision + recall), 4) if hit else 0.0,
+        "jaccard": round(sum(jaccard) / len(jaccard), 4) if jaccard else 0.0,
+        f"top{top}_overlap": round(len(top_pred & top_ref) / max(len(top_ref), 1), 4),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("workbooks", nargs="*", help="측정할 워크북 (xlsx / parquet / zip)")
+    parser.add_argument("--backends", nargs="+", choices=list(engine.NOUN_BACKENDS),
+                        default=engine.available_noun_backends(), help="비교할 백엔드 (기본: 설치된 전부)")
+    parser.add_argument("--reference", help="일치율 기준 백엔드 (기본: 설치되어 있으면 okt)")
+    parser.add_argument("--rows", type=int, default=20_000, help="워크북이 없을 때 합성 문장 수")
+    parser.add_argument("--sample", type=int, help="측정할 서로 다른 문장 수 (기본: 전부)")
+    parser.add_argument("--top", type=int, default=20, help="TOP n 겹침 비율의 n")
+    parser.add_argument("--no-memory", action="store_true", help="tracemalloc 측정 생략")
+    parser.add_argument("--json", help="결과를 저장할 JSON 경로")
+    args = parser.parse_args()
+
+    missing = [b for b in args.backends if not engine.noun_backend_available(b)]
+    if missing:
+        parser.error(f"설치되지 않은 백엔드: {', '.join(missing)}")
+    reference = args.reference or ("okt" if "okt" in args.backends else None)
+    if reference and reference not in args.backends:
+        parser.error("--reference는 --backends 중 하나여야 합니다")
+    texts = load_corpus(args.workbooks, args.rows)
+    if texts.dropna().empty:
+        parser.error("'내용' 문장이 없습니다")
+
+    lists = {}
+    table = engine.benchmark_noun_backends(texts, args.backends, sample=args.sample, memory=not args.no_memory,
+                                           lists=lists)
+    print("(최대 MB는 Python 힙 기준 — JVM·네이티브 메모리 제외)")
+    print(table.to_string(index=False))
+    results = table.astype(object).where(table.notna(), None).to_dict("records")
+    if reference in lists:
+        for row in results:
+            if row["백엔드"] != reference and row["백엔드"] in lists:
+                row[f"agreement_vs_{reference}"] = scores = agreement(lists[row["백엔드"]], lists[reference], args.top)
+                print(f"{row['백엔드']} vs {reference}: " + ", ".join(f"{k} {v:.3f}" for k, v in scores.items()))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fp:
+            json.dump(results, fp, ensure_ascii=False, indent=2)
+
+if __name__ == "__main__":
+    main()
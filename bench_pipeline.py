@@ -0,0 +1,194 @@
+"""분석 파이프라인 단계별 처리량 / 최대 메모리 측정 (합성 KAB-R-MSCB 워크북)
+
+사용법: python bench_pipeline.py --rows 1000 10000 100000 [--json bench_pipeline.json]
+(1,000,000행까지 가능하지만 xlsx 생성·읽기에 수 분이 걸림, --no-memory로 메모리 측정 생략)
+"""
+import argparse
+import json
+import tempfile
+import time
+import tracemalloc
+from io import BytesIO
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import engine
+from exporter import write_xlsx
+from ingest import parse_workbook
+
+# ISO/IEC 17021-1 조항 → 세부조항 수 (지적이 많이 나오는 7·9장에 가중치)
+CLAUSES = {
+    "4": 6, "5": 3, "6": 2, "7": 5, "8": 5, "9": 9, "10": 3,
+}
+CLAUSE_WEIGHTS = {"4": 1, "5": 1, "6": 1, "7": 4, "8": 2, "9": 6, "10": 1}
+SUBJECTS = [
+    "내부심사 계획", "심사원 역량 평가 기록", "문서관리 절차", "공평성 위험 평가", "인증 결정 기록",
+    "심사 프로그램", "고객 불만 처리 절차", "외부 심사원 계약", "경영검토 회의록", "시정조치 검증 결과",
+    "심사 보고서", "인증서 발행 대장", "정보 보안 관리", "교육훈련 계획", "기록 보존 기간",
+]
+FINDING_PREDICATES = [
+    "이 수립되지 않음.", "이 최신화되어 있지 않음.", "에 대한 객관적 증거가 없음.",
+    "이 절차서와 다르게 운영됨.", "의 승인 기록이 누락됨.", "을 주기적으로 검토하지 않음.",
+]
+RECOMMENDATION_PREDICATES = [
+    "의 개선이 필요함.", "을 보다 구체적으로 작성할 것을 권고함.", "의 효과성 검토가 필요함.",
+]
+# 실제 지적 문장처럼 현장·관련 문서 번호를 붙여 거의 모든 문장이 서로 다르게 함 (중복 제거·명사 캐시가 과대평가되지 않도록)
+SITES = ["본사", "지사", "심사팀", "인증사업부", "교육센터", "시험소", "현장", "위원회"]
+DOCUMENTS = ["절차서", "지침", "양식", "기록", "보고서", "회의록", "계약서", "대장"]
+
+def _sub_clauses():
+    return {c: [f"{c}.{i}.{j}" for i in range(1, n + 1) for j in range(1, 4)] for c, n in CLAUSES.items()}
+
+def synthetic_findings(rows, seed=0):
+    """평가 결과 시트 형태의 임의 데이터 (노이즈 컬럼 포함 — drop_noise_columns 대상)"""
+    rng = np.random.default_rng(seed)
+    clauses = np.array(list(CLAUSES))
+    weights = np.array([CLAUSE_WEIGHTS[c] for c in clauses], dtype=float)
+    main = rng.choice(clauses, rows, p=weights / weights.sum())
+    subs = _sub_clauses()
+    sub = np.array([subs[c][k % len(subs[c])] for c, k in zip(main, rng.integers(0, 1000, rows))])
+    kind = rng.choice(["부적합", "권고"], rows, p=[0.4, 0.6])
+    subject = rng.choice(SUBJECTS, rows)
+    finding = rng.choice(FINDING_PREDICATES, rows)
+    recommendation = rng.choice(RECOMMENDATION_PREDICATES, rows)
+    site = rng.choice(SITES, rows)
+    document = rng.choice(DOCUMENTS, rows)
+    number = rng.integers(1, 100_000, rows)
+    text = [
+        f"{where} {s}{f if k == '부적합' else r} (관련 {doc} 제{n}호)"
+        for where, s, f, r, k, doc, n in zip(site, subject, finding, recommendation, kind, document, number)
+    ]
+    return pd.DataFrame({
+        "기관명": rng.choice([f"인증기관{i}" for i in range(1, 41)], rows),
+        "평가종류": rng.choice(["최초", "정기", "재평가"], rows),
+        "시작일": "2024-03-04",
+        "종료일": "2024-03-06",
+        "발행번호": [f"KAB-{i:07d}" for i in range(rows)],
+        "인정기준": "KAB-R-MSCB",
+        "조항": main,
+        "세부조항": sub,
+        "구분": kind,
+        "내용": text,
+    })
+
+def synthetic_standards():
+    """기준 시트: 조항·세부조항별 요구사항"""
+    keys = list(CLAUSES) + [s for subs in _sub_clauses().values() for s in subs]
+    return pd.DataFrame({"조항": keys, "요구사항": [f"인증기관은 {k} 요구사항을 충족해야 한다." for k in keys]})
+
+def synthetic_workbook(rows, seed=0):
+    """findings + 기준 두 시트 xlsx 바이트"""
+    buffer = BytesIO()
+    with pd.ExcelWriter(buffer, engine="xlsxwriter") as writer:
+        synthetic_findings(rows, seed).to_excel(writer, sheet_name="평가결과", index=False)
+        synthetic_standards().to_excel(writer, sheet_name="기준", index=False)
+    return buffer.getvalue()
+
+def measure(stage, *args, memory=True):
+    """(결과, 초, 최대 추적 메모리 MB 또는 None) — 시간과 메모리는 따로 측정 (bench_export와 동일)"""
+    started = time.perf_counter()
+    result = stage(*args)
+    elapsed = time.perf_counter() - started
+    if not memory:
+        return result, elapsed, None
+    tracemalloc.start()
+    stage(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak / 2**20
+
+def _build_indexes(findings, backend):
+    if backend == "duckdb":
+        return engine.DuckDBBackend(findings)
+    return engine.FilterIndex(findings), engine.TextIndex(findings["내용"]), engine.ClauseTrie(findings)
+
+def _filter(indexes, query):
+    if isinstance(indexes, engine.DuckDBBackend):
+        return indexes.filter_mask(query)
+    filter_index, text_index, clause_trie = indexes
+    row_mask = filter_index.select({"구분": query["구분"]})
+    for mask in (text_index.search(query["키워드"]), clause_trie.search(query["조항검색"])):
+        if mask is not None:
+            row_mask &= mask
+    return row_mask
+
+def _extract_nouns(text_series, tmp_dir):
+    # 호출마다 빈 NounStore — 시간·메모리 두 번의 측정과 이전 실행이 명사 캐시를 읽지 않도록
+    store = engine.NounStore(Path(tempfile.mkdtemp(dir=tmp_dir)) / "nouns.sqlite3")
+    return engine.extract_nouns(text_series, store=store)
+
+def _aggregate(findings, row_mask, indexes, query):
+    if isinstance(indexes, engine.DuckDBBackend):
+        return indexes.count_tables(query)
+    cube = engine.StatsCube(findings)
+    counts = cube.cell_counts(row_mask)
+    return [cube.marginal(dim, counts) for dim in cube.dims]
+
+def run_pipeline(data, query, memory=True, backend="pandas"):
+    """워크북 바이트 → [(단계, 초, 최대 MB, 처리 행 수)] — 앱과 같은 순서로 실행
+
+    backend="duckdb"면 build_indexes / filter / aggregate 단계를 DuckDB로 실행
+    """
+    timings = []
+
+    def step(name, stage, *args, rows=None):
+        result, seconds, peak_mb = measure(stage, *args, memory=memory)
+        timings.append((name, seconds, peak_mb, rows))
+        return result
+
+    raw, standards = step("read_excel", parse_workbook, data)
+    n_rows = len(raw)
+    findings = step("drop_noise_columns", engine.drop_noise_columns, raw, rows=n_rows)
+    findings = step("add_req_text", engine.add_req_text, findings, standards, rows=n_rows)
+    findings = step("compact_frame", engine.compact_frame, findings, rows=n_rows)
+    indexes = step("build_indexes", _build_indexes, findings, backend, rows=n_rows)
+    row_mask = step("filter", _filter, indexes, query, rows=n_rows)
+    if engine.noun_backend_available():
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            step("extract_nouns", _extract_nouns, findings["내용"][row_mask], tmp_dir, rows=int(row_mask.sum()))
+    step("aggregate", _aggregate, findings, row_mask, indexes, query, rows=n_rows)
+    step("to_excel", lambda f: write_xlsx(f, BytesIO()), findings[row_mask], rows=int(row_mask.sum()))
+    return [(name, seconds, peak_mb, n_rows if rows is None else rows) for name, seconds, peak_mb, rows in timings]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--keyword", default="심사 | 기록", help="내용 검색어 (앱과 같은 문법)")
+    parser.add_argument("--clause", default="9", help="조항 검색어")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--backend", nargs="+", choices=engine.QUERY_BACKENDS, default=["pandas"],
+                        help="검색·집계 백엔드 (여러 개면 차례로 비교)")
+    parser.add_argument("--no-memory", action="store_true", help="tracemalloc 측정 생략 (대용량에서 시간 절반)")
+    parser.add_argument("--json", help="결과를 저장할 JSON 경로")
+    args = parser.parse_args()
+
+    query = {"구분": ["부적합"], "키워드": args.keyword, "조항검색": args.clause}
+    if not engine.noun_backend_available():
+        print(f"※ 명사 분석기 '{engine.NOUN_BACKEND}'가 설치되어 있지 않아 extract_nouns 단계는 생략합니다.")
+    if "duckdb" in args.backend and not engine.duckdb_available:
+        parser.error("duckdb 모듈이 없습니다 (pip install duckdb)")
+
+    results = []
+    print(f"{'rows':>10}  {'backend':<8}{'stage':<20}{'seconds':>10}{'rows/s':>14}{'peak MB':>10}")
+    for rows in args.rows:
+        data = synthetic_workbook(rows, args.seed)
+        for backend in args.backend:
+            timings = run_pipeline(data, query, memory=not args.no_memory, backend=backend)
+            for stage, seconds, peak_mb, stage_rows in timings:
+                throughput = stage_rows / max(seconds, 1e-9)
+                results.append({
+                    "rows": rows, "backend": backend, "stage": stage, "stage_rows": stage_rows,
+                    "seconds": round(seconds, 4), "rows_per_sec": round(throughput),
+                    "peak_mb": None if peak_mb is None else round(peak_mb, 1),
+                })
+                peak = "-" if peak_mb is None else f"{peak_mb:.1f}"
+                print(f"{rows:>10,}  {backend:<8}{stage:<20}{seconds:>10.3f}{throughput:>14,.0f}{peak:>10}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fp:
+            json.dump(results, fp, ensure_ascii=False, indent=2)
+
+if __name__ == "__main__":
+    main()
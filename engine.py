@@ -0,0 +1,787 @@
+"""부적합 분석 엔진 (정리 · 요구사항 매칭 · 검색 · 명사 빈도 · 집계) — Streamlit 없이 사용 가능
+
+app.py는 이 모듈의 함수를 세션 캐시로 감싸 화면에 표시하고, batch.py는 폴더 단위로 일괄 실행
+"""
+import functools
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from korean_nouns import NgramTokenizer, SimpleNounExtractor, lexicon_version
+
+# ----------------- konlpy(Okt) optional import -----------------
+# Okt()는 JVM을 기동하므로 import 시점이 아니라 TokenizerLoader에서 지연 생성
+try:
+    import konlpy
+    from konlpy.tag import Okt
+    okt_available = True
+    OKT_VERSION = f"okt-{getattr(konlpy, '__version__', 'unknown')}"
+except ModuleNotFoundError:
+    okt_available = False
+    OKT_VERSION = None
+
+# ----------------- 그 밖의 형태소 분석기 optional import -----------------
+# Mecab(python-mecab-ko, 사전 포함 배포)과 Kiwi(kiwipiepy)는 JVM 없이 C/C++로 동작
+try:
+    import mecab
+    mecab_available = True
+    MECAB_VERSION = f"mecab-{getattr(mecab, '__version__', 'unknown')}"
+except ModuleNotFoundError:
+    mecab_available = False
+    MECAB_VERSION = None
+
+try:
+    import kiwipiepy
+    from kiwipiepy import Kiwi
+    kiwi_available = True
+    KIWI_VERSION = f"kiwi-{getattr(kiwipiepy, '__version__', 'unknown')}"
+except ModuleNotFoundError:
+    kiwi_available = False
+    KIWI_VERSION = None
+
+# ----------------- duckdb optional import -----------------
+# 대용량 이력 데이터용 검색·집계 백엔드 (없으면 pandas 경로만 사용)
+try:
+    import duckdb
+    duckdb_available = True
+except ModuleNotFoundError:
+    duckdb_available = False
+
+QUERY_BACKENDS = ["pandas", "duckdb"]
+
+# 명사 캐시, 업로드 스냅숏 등 로컬 캐시 파일 위치
+CACHE_DIR = Path(os.environ.get("FINDINGS_CACHE_DIR", Path(__file__).resolve().parent / ".cache"))
+
+# ----------------- 기본 데이터 -----------------
+DEFAULT_FINDINGS = pd.DataFrame({
+    "인정기준": ["KAB-R-MSCB"]*6,
+    "조항": ["7", "7.1", "7.2", "8.3", "9.1", "9.2"],
+    "세부조항": ["7.1", "7.1.1", "7.1.2", "8.3.1", "9.1.1", "9.2.2"],
+    "구분": ["부적합", "권고", "부적합", "권고", "부적합", "권고"],
+    "내용": [
+        "조직은 품질경영시스템 자원의 충분성을 확보하지 못함.",
+        "프로세스 운영계획서에 인원 배치가 미흡함.",
+        "고객 요구사항 검토 절차 미이행.",
+        "변경관리 절차서가 최신화되어 있지 않음.",
+        "내부심사 계획이 적시에 수립되지 않음.",
+        "고객만족도 조사 절차 개선 필요."
+    ]
+})
+DEFAULT_STANDARDS = pd.DataFrame({
+    "조항": ["7", "7.1", "7.2", "8.3", "9.1", "9.2"],
+    "요구사항": [
+        "조직은 필요한 자원을 결정하고 제공해야 한다.",
+        "조직은 인프라를 포함한 필요한 자원을 제공해야 한다.",
+        "조직은 인적 자원의 역량을 보장해야 한다.",
+        "제품 및 서비스 설계개발을 관리해야 한다.",
+        "모니터링 및 측정을 통해 시스템 성과를 평가해야 한다.",
+        "내부심사를 계획하고 실시해야 한다."
+    ]
+})
+
+# ----------------- 유틸 -----------------
+def drop_noise_columns(df):
+    noise = {"기관명","평가종류","시작일","종료일","발행번호"}
+    unnamed = [c for c in df.columns if str(c).startswith("Unnamed")]
+    return df.drop(columns=list(noise)+unnamed, errors="ignore")
+
+SOURCE_COLUMN = "출처파일"
+CATEGORY_COLUMNS = ["인정기준", "조항", "세부조항", "구분", SOURCE_COLUMN]
+TEXT_COLUMNS = ["내용", "요구사항"]
+
+def compact_frame(frame):
+    """반복값 컬럼은 문자열 범주형, 긴 텍스트는 Arrow 문자열로 변환 (메모리 절감)"""
+    out = frame.copy(deep=False)
+    for col in CATEGORY_COLUMNS:
+        if col in out:
+            values = out[col]
+            out[col] = values.astype(str).where(values.notna()).astype("category")
+    for col in TEXT_COLUMNS:
+        if col in out:
+            out[col] = out[col].astype("string[pyarrow]")
+    return out
+
+def build_req_index(standards):
+    """기준 시트 → 조항별 요구사항 Series (중복 조항은 첫 행 우선)"""
+    if standards is None:
+        return None
+    std_cols = standards.columns
+    clause_col = next((c for c in std_cols if c in ["조항","Clause","항목"]), None)
+    req_col = next((c for c in std_cols if c in ["요구사항","Requirement","내용"]), None)
+    if not clause_col or not req_col:
+        return None
+    clauses = standards[clause_col].astype(str)
+    first = standards[clause_col].notna() & ~clauses.duplicated(keep="first")
+    return pd.Series(standards[req_col].values[first.values], index=clauses[first].values)
+
+def add_req_text(findings, standards):
+    """세부조항 → 조항 순으로 요구사항 매칭 (조항 인덱스 기반 map)"""
+    req_index = build_req_index(standards)
+    if req_index is None:
+        return findings
+    req = pd.Series("", index=findings.index, dtype=object)
+    # 조항 매칭 후 세부조항 매칭으로 덮어써서 세부조항을 우선
+    for col in ["조항", "세부조항"]:
+        if col not in findings:
+            continue
+        keys = findings[col].astype(str)
+        hit = findings[col].notna() & keys.isin(req_index.index)
+        req[hit] = keys[hit].map(req_index)
+    return findings.assign(요구사항=req)
+
+# ----------------- 명사 분석 -----------------
+class KiwiNouns:
+    """Kiwi → nouns() 인터페이스 (일반·고유 명사만, Okt.nouns와 같은 형태)"""
+
+    def __init__(self):
+        self._kiwi = Kiwi()
+
+    def nouns(self, text):
+        return [token.form for token in self._kiwi.tokenize(text) if token.tag in ("NNG", "NNP")]
+
+# 명사 추출 백엔드: 이름 → (사용 가능 여부, 분석기 생성 함수, NounStore 캐시 버전, 스레드 분배 여부)
+# 분석기는 모두 nouns(text) → 명사 목록 인터페이스, 순수 Python 백엔드는 GIL 때문에 순차 실행
+NOUN_BACKENDS = {
+    "mecab": (mecab_available, lambda: mecab.MeCab(), MECAB_VERSION, True),
+    "kiwi": (kiwi_available, KiwiNouns, KIWI_VERSION, True),
+    "okt": (okt_available, lambda: Okt(), OKT_VERSION, True),
+    "simple": (True, SimpleNounExtractor, lexicon_version(), False),
+    "ngram": (True, NgramTokenizer, NgramTokenizer().version, False),
+}
+
+def available_noun_backends():
+    return [name for name, (available, *_) in NOUN_BACKENDS.items() if available]
+
+# FINDINGS_NOUN_BACKEND로 지정, 없으면 설치된 것 중 품질·속도 순 (mecab → kiwi → okt → simple)
+NOUN_BACKEND = os.environ.get("FINDINGS_NOUN_BACKEND", "").strip().lower() or available_noun_backends()[0]
+
+def noun_backend_available(backend=NOUN_BACKEND):
+    return backend in NOUN_BACKENDS and NOUN_BACKENDS[backend][0]
+
+class TokenizerLoader:
+    """형태소 분석기 지연 생성 (백엔드별 프로세스당 1개, NounStore에 없는 문장을 처음 분석할 때 생성)"""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self._tokenizer = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        # 여러 스레드가 동시에 요청해도 한 번만 생성 (Okt는 JVM 기동, Kiwi는 모델 로드)
+        with self._lock:
+            if self._tokenizer is None:
+                self._tokenizer = NOUN_BACKENDS[self.backend][1]()
+            return self._tokenizer
+
+@functools.cache
+def get_tokenizer_loader(backend=NOUN_BACKEND):
+    """백엔드별 프로세스당 1개 (JVM은 프로세스당 1번만 기동)"""
+    return TokenizerLoader(backend)
+
+class NounStore:
+    """문장 해시(분석기 버전 포함) → 명사 목록 SQLite 저장소 (세션/재시작 간 공유)"""
+
+    def __init__(self, path):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS nouns (key TEXT PRIMARY KEY, nouns TEXT NOT NULL)")
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(text, version):
+        return hashlib.sha1(f"{version}\0{text}".encode("utf-8")).hexdigest()
+
+    def get_many(self, keys, batch=500):
+        found = {}
+        with self._lock:
+            for i in range(0, len(keys), batch):
+                part = keys[i:i + batch]
+                rows = self._conn.execute(
+                    f"SELECT key, nouns FROM nouns WHERE key IN ({','.join('?' * len(part))})", part
+                )
+                found.update((k, v.split("\t") if v else []) for k, v in rows)
+        return found
+
+    def put_many(self, items):
+        """items: (key, 명사 목록) 쌍"""
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO nouns (key, nouns) VALUES (?, ?)",
+                [(k, "\t".join(v)) for k, v in items],
+            )
+            self._conn.commit()
+
+@functools.cache
+def get_noun_store():
+    return NounStore(CACHE_DIR / "nouns.sqlite3")
+
+NOUN_CHUNK_SIZE = 500
+NOUN_WORKERS = min(4, os.cpu_count() or 1)
+
+def _tokenize_chunk(tokenizer, texts):
+    return [tokenizer.nouns(txt) for txt in texts]
+
+def noun_lists(texts, chunk_size=NOUN_CHUNK_SIZE, workers=NOUN_WORKERS, store=None, backend=NOUN_BACKEND,
+               cached_only=False):
+    """서로 다른 문장 목록 → 문장별 명사 목록 dict
+
+    이미 분석한 문장은 NounStore에서 읽고, 나머지만 chunk 단위로 스레드 풀에 분배
+    (분석기 인스턴스 하나를 공유 — JVM은 프로세스당 1개, 순수 Python 백엔드는 순차 실행)
+    cached_only=True면 분석기를 만들지 않고, 저장소에 없는 문장이 하나라도 있으면 None
+    """
+    if store is None:
+        store = get_noun_store()
+    _, _, version, threaded = NOUN_BACKENDS[backend]
+    if not threaded:
+        workers = 1
+    keys = [NounStore.key(txt, version) for txt in texts]
+    cached = store.get_many(keys)
+
+    missing = [(k, txt) for k, txt in zip(keys, texts) if k not in cached]
+    if missing and cached_only:
+        return None
+    if missing:
+        tokenizer = get_tokenizer_loader(backend).get()
+        miss_texts = [txt for _, txt in missing]
+        chunks = [miss_texts[i:i + chunk_size] for i in range(0, len(miss_texts), chunk_size)]
+        if workers <= 1 or len(chunks) <= 1:
+            results = [_tokenize_chunk(tokenizer, chunk) for chunk in chunks]
+        else:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix=backend) as pool:
+                results = list(pool.map(lambda chunk: _tokenize_chunk(tokenizer, chunk), chunks))
+        fresh = list(zip((k for k, _ in missing), (n for chunk in results for n in chunk)))
+        store.put_many(fresh)
+        cached.update(fresh)
+    return {txt: cached[k] for k, txt in zip(keys, texts)}
+
+def extract_nouns(text_series, chunk_size=NOUN_CHUNK_SIZE, workers=NOUN_WORKERS, store=None,
+                  backend=NOUN_BACKEND):
+    """한글 텍스트에서 명사 빈도 추출 → Counter (backend가 설치되어 있지 않으면 빈 Counter)
+
+    같은 문장은 한 번만 분석하고 등장 횟수만큼 가중
+    """
+    if not noun_backend_available(backend):
+        return Counter()
+    uniq = text_series.dropna().astype(str).value_counts(sort=False)
+    lists = noun_lists(uniq.index.tolist(), chunk_size, workers, store, backend)
+    nouns = Counter()
+    for txt, weight in uniq.items():
+        for noun in lists[txt]:
+            nouns[noun] += weight
+    return nouns
+
+NOUN_BENCH_SAMPLE = 500
+
+def benchmark_noun_backends(text_series, backends=None, sample=NOUN_BENCH_SAMPLE, seed=0, memory=True, lists=None):
+    """설치된 명사 백엔드별 처리량 비교 → DataFrame (NounStore 캐시 없이 서로 다른 문장 sample개, None이면 전부)
+
+    기동 초는 새 인스턴스 생성 시간 (Okt는 JVM이 이미 떠 있으면 짧게 나옴),
+    최대 MB는 tracemalloc 기준 Python 힙 — JVM·C++ 네이티브 메모리는 포함되지 않음 (memory=False면 생략)
+    lists에 dict를 주면 백엔드 → 문장별 명사 목록을 채움 (분석기 간 일치율 비교용, 문장 순서는 모든 백엔드가 같음)
+    """
+    texts = text_series.dropna().astype(str).drop_duplicates()
+    if sample is not None and len(texts) > sample:
+        texts = texts.sample(sample, random_state=seed)
+    texts = texts.tolist()
+    n_chars = sum(map(len, texts))
+    rows = []
+    for backend in backends or available_noun_backends():
+        row = {"백엔드": backend, "문장 수": len(texts), "기동 초": None, "초": None,
+               "문장/초": None, "글자/초": None, "최대 MB": None, "오류": None}
+        try:
+            started = time.perf_counter()
+            tokenizer = NOUN_BACKENDS[backend][1]()
+            row["기동 초"] = round(time.perf_counter() - started, 3)
+            if texts:
+                tokenizer.nouns(texts[0])  # 워밍업 (지연 초기화되는 사전·모델)
+            started = time.perf_counter()
+            nouns = _tokenize_chunk(tokenizer, texts)
+            seconds = max(time.perf_counter() - started, 1e-9)
+            row.update({"초": round(seconds, 3), "문장/초": round(len(texts) / seconds),
+                        "글자/초": round(n_chars / seconds)})
+            if lists is not None:
+                lists[backend] = nouns
+            if memory:
+                tracemalloc.start()
+                _tokenize_chunk(tokenizer, texts)
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                row["최대 MB"] = round(peak / 2**20, 1)
+        except Exception as e:  # Java 미설치, Mecab 사전 없음 등
+            if tracemalloc.is_tracing():
+                tracemalloc.stop()
+            row["오류"] = f"{type(e).__name__}: {e}"
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+class NounMatrix:
+    """행 × 명사 희소 빈도 행렬 (COO) — 필터된 행의 명사 빈도를 마스크 합으로 계산"""
+
+    def __init__(self, vocab, rows, cols, counts, n_rows):
+        self.vocab = vocab
+        self.rows = rows
+        self.cols = cols
+        self.counts = counts
+        self.n_rows = n_rows
+
+    @classmethod
+    def from_texts(cls, text_series, **kwargs):
+        """행 순서대로 명사 빈도 행렬 생성 (같은 문장은 한 번만 분석, cached_only=True에서 캐시 누락이면 None)"""
+        codes, uniques = pd.factorize(text_series.map(lambda v: v if pd.isna(v) else str(v)))
+        lists = noun_lists(list(uniques), **kwargs)
+        if lists is None:
+            return None
+        vocab_ids = {}
+        u_cols, u_counts, u_lens = [], [], np.zeros(len(uniques), dtype=np.int64)
+        for j, txt in enumerate(uniques):
+            counter = Counter(lists[txt])
+            u_cols.extend(vocab_ids.setdefault(noun, len(vocab_ids)) for noun in counter)
+            u_counts.extend(counter.values())
+            u_lens[j] = len(counter)
+        u_cols = np.asarray(u_cols, dtype=np.int64)
+        u_counts = np.asarray(u_counts, dtype=np.int64)
+        u_ptr = np.cumsum(u_lens) - u_lens
+
+        # 행별로 해당 문장의 (명사, 빈도) 구간을 이어 붙임 (NaN 행은 끝의 빈 구간)
+        codes = np.where(codes < 0, len(uniques), codes)
+        lens = np.append(u_lens, 0)[codes]
+        starts = np.append(u_ptr, 0)[codes]
+        rows = np.repeat(np.arange(len(codes)), lens)
+        offsets = np.arange(lens.sum()) - np.repeat(np.cumsum(lens) - lens, lens)
+        pos = np.repeat(starts, lens) + offsets
+        vocab = np.array(list(vocab_ids), dtype=object)
+        return cls(vocab, rows, u_cols[pos], u_counts[pos], len(codes))
+
+    def top(self, row_mask=None, n=10):
+        """row_mask(행 순서 bool 배열)에 해당하는 행의 명사 TOP n → Series"""
+        if row_mask is None:
+            cols, counts = self.cols, self.counts
+        else:
+            sel = np.asarray(row_mask, dtype=bool)[self.rows]
+            cols, counts = self.cols[sel], self.counts[sel]
+        sums = np.bincount(cols, weights=counts, minlength=len(self.vocab)).astype(np.int64)
+        order = np.argsort(-sums, kind="stable")[:n]
+        order = order[sums[order] > 0]
+        return pd.Series(sums[order], index=self.vocab[order], name="count")
+
+# ----------------- 검색 -----------------
+FILTER_COLUMNS = ["조항", "세부조항", "구분"]
+
+class FilterIndex:
+    """조항/세부조항/구분 범주 코드 + 값별 행 비트맵 (워크북당 1회 생성)"""
+
+    def __init__(self, frame, columns=FILTER_COLUMNS):
+        self.n_rows = len(frame)
+        self.codes = {}
+        self.options = {}
+        self._bitmaps = {}
+        for col in columns:
+            if col not in frame:
+                continue
+            values = frame[col]
+            codes, cats = pd.factorize(values.astype(str).where(values.notna()), sort=True)
+            self.codes[col] = codes
+            self.options[col] = list(cats)
+            # 코드 순으로 정렬한 행 번호를 잘라 값별 비트맵(packbits) 생성
+            order = np.argsort(codes, kind="stable")
+            bounds = np.searchsorted(codes[order], np.arange(len(cats) + 1))
+            bitmaps = {}
+            for code, cat in enumerate(cats):
+                bits = np.zeros(self.n_rows, dtype=bool)
+                bits[order[bounds[code]:bounds[code + 1]]] = True
+                bitmaps[cat] = np.packbits(bits)
+            self._bitmaps[col] = bitmaps
+
+    def select(self, selections):
+        """{컬럼: 선택값 목록} → 행 bool 마스크 (컬럼 내 OR, 컬럼 간 AND, 빈 선택은 무시)"""
+        bits = np.packbits(np.ones(self.n_rows, dtype=bool))
+        for col, chosen in selections.items():
+            if not chosen or col not in self._bitmaps:
+                continue
+            col_bits = np.zeros_like(bits)
+            for value in chosen:
+                value_bits = self._bitmaps[col].get(value)
+                if value_bits is not None:
+                    col_bits |= value_bits
+            bits &= col_bits
+        return np.unpackbits(bits, count=self.n_rows).astype(bool)
+
+_QUERY_TOKEN = re.compile(r'"([^"]*)"|(\|)|([^\s|"]+)')
+
+def parse_search_query(query):
+    """'A B | "C D"' → [["A", "B"], ["C D"]] (공백 = AND, | 또는 OR = OR, 따옴표 = 구문)"""
+    groups, current = [], []
+    for phrase, bar, word in _QUERY_TOKEN.findall(query):
+        if bar or word == "OR":
+            if current:
+                groups.append(current)
+            current = []
+        elif phrase or word:
+            current.append(phrase or word)
+    if current:
+        groups.append(current)
+    return groups
+
+class TextIndex:
+    """내용 컬럼 문자 1·2-gram 역색인 — 리터럴 부분 문자열 검색 (대소문자 무시)"""
+
+    _EMPTY = np.zeros(0, dtype=np.int32)
+
+    def __init__(self, text_series):
+        codes, uniques = pd.factorize(text_series.astype(str).where(text_series.notna()))
+        self.docs = [txt.lower() for txt in uniques]
+        # 행 → 문장(doc) 번호, NaN 행은 항상 불일치인 마지막 칸
+        self._codes = np.where(codes < 0, len(self.docs), codes)
+        self._postings = self._build_postings(self.docs)
+
+    @staticmethod
+    def _gram_key(gram):
+        """1·2글자 → 정수 키 (2-gram은 항상 2**21 이상이라 1-gram과 겹치지 않음)"""
+        if len(gram) == 1:
+            return ord(gram)
+        return ((ord(gram[0]) + 1) << 21) | ord(gram[1])
+
+    @staticmethod
+    def _build_postings(docs):
+        """문장 전체를 코드포인트 배열 하나로 펼쳐 (gram 키, doc) 쌍을 numpy로 정렬·중복 제거"""
+        lens = np.fromiter(map(len, docs), dtype=np.int64, count=len(docs))
+        if not lens.sum():
+            return {}
+        cps = np.frombuffer("\0".join(docs).encode("utf-32-le"), dtype=np.uint32).astype(np.int64)
+        doc_of = np.repeat(np.arange(len(docs), dtype=np.int32), lens + 1)[:len(cps)]
+        valid = np.ones(len(cps), dtype=bool)
+        valid[np.cumsum(lens + 1)[:-1] - 1] = False  # 문장 사이 구분자
+        pair = valid[:-1] & valid[1:]
+        keys = np.concatenate([cps[valid], ((cps[:-1][pair] + 1) << 21) | cps[1:][pair]])
+        owners = np.concatenate([doc_of[valid], doc_of[:-1][pair]])
+        order = np.lexsort((owners, keys))
+        keys, owners = keys[order], owners[order]
+        first = np.ones(len(keys), dtype=bool)
+        first[1:] = (keys[1:] != keys[:-1]) | (owners[1:] != owners[:-1])
+        keys, owners = keys[first], owners[first]
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+        return dict(zip(keys[starts].tolist(), np.split(owners, starts[1:])))
+
+    def _match_term(self, term):
+        term = term.lower()
+        if len(term) == 1:
+            return self._postings.get(self._gram_key(term), self._EMPTY)
+        grams = {self._gram_key(term[i:i + 2]) for i in range(len(term) - 1)}
+        lists = sorted((self._postings.get(gram, self._EMPTY) for gram in grams), key=len)
+        candidates = lists[0]
+        for ids in lists[1:]:
+            if not len(candidates):
+                break
+            candidates = np.intersect1d(candidates, ids, assume_unique=True)
+        if len(term) == 2:
+            return candidates
+        # 2-gram이 모두 있어도 연속 문자열이 아닐 수 있으므로 후보만 확인
+        return np.fromiter((d for d in candidates if term in self.docs[d]), dtype=np.int32)
+
+    def search(self, query):
+        """검색어 → 행 bool 마스크 (검색어가 비어 있으면 None)"""
+        groups = parse_search_query(query)
+        if not groups:
+            return None
+        matched = self._EMPTY
+        for terms in groups:
+            docs = None
+            for term in terms:
+                ids = self._match_term(term)
+                docs = ids if docs is None else np.intersect1d(docs, ids, assume_unique=True)
+            matched = np.union1d(matched, docs)
+        hit = np.zeros(len(self.docs) + 1, dtype=bool)
+        hit[matched] = True
+        return hit[self._codes]
+
+def clause_path(value):
+    """'7.1.2' → ['7', '1', '2'] (앞뒤 공백·빈 구간 무시)"""
+    return [seg.strip() for seg in str(value).strip().split(".") if seg.strip()]
+
+class ClauseTrie:
+    """점(.) 구분 조항 번호 트리 — '7' → 7, 7.x, 7.x.y … 계층 접두 검색 (7.1 ≠ 17.1, 7.10)"""
+
+    def __init__(self, frame, columns=("조항", "세부조항")):
+        self.n_rows = len(frame)
+        self._root = ({}, [])  # 노드 = (하위 노드 dict, 해당 조항인 행 번호 배열 목록)
+        for col in columns:
+            if col not in frame:
+                continue
+            values = frame[col]
+            codes, clauses = pd.factorize(values.astype(str).where(values.notna()))
+            order = np.argsort(codes, kind="stable")
+            bounds = np.searchsorted(codes[order], np.arange(len(clauses) + 1))
+            for code, clause in enumerate(clauses):
+                path = clause_path(clause)
+                if not path:
+                    continue
+                node = self._root
+                for seg in path:
+                    node = node[0].setdefault(seg, ({}, []))
+                node[1].append(order[bounds[code]:bounds[code + 1]])
+
+    def search(self, query):
+        """조항 번호 → 해당 조항 및 모든 하위 조항의 행 bool 마스크 (검색어가 비어 있으면 None)"""
+        path = clause_path(query)
+        if not path:
+            return None
+        mask = np.zeros(self.n_rows, dtype=bool)
+        node = self._root
+        for seg in path:
+            node = node[0].get(seg)
+            if node is None:
+                return mask
+        stack = [node]
+        while stack:
+            children, rows = stack.pop()
+            for ids in rows:
+                mask[ids] = True
+            stack.extend(children.values())
+        return mask
+
+# ----------------- 정렬 / 통계 -----------------
+def clause_sort_key(value):
+    """조항 자연 정렬 키: 7.2 < 7.10 < 10"""
+    return [(0, int(seg), "") if seg.isdigit() else (1, 0, seg) for seg in clause_path(value)]
+
+def build_sort_ranks(frame, columns):
+    """컬럼별 행 정렬 순위 배열 (조항은 자연 정렬, 빈 값은 -1 — page_rows에서 방향과 관계없이 맨 뒤)"""
+    ranks = {}
+    for col in columns:
+        if col not in frame:
+            continue
+        values = frame[col]
+        codes, uniques = pd.factorize(values.astype(str).where(values.notna()))
+        key = clause_sort_key if col in ("조항", "세부조항") else None
+        order = sorted(range(len(uniques)), key=(lambda i: key(uniques[i])) if key else uniques.__getitem__)
+        rank_of = np.empty(len(uniques) + 1, dtype=np.int64)
+        rank_of[order] = np.arange(len(uniques))
+        rank_of[-1] = -1  # NaN(code -1) → 마지막 원소
+        ranks[col] = rank_of[codes]
+    return ranks
+
+def page_rows(row_mask, page, page_size, ranks=None, descending=False):
+    """필터 마스크 → (정렬된 해당 페이지 행 번호, 전체 건수) — 페이지 밖 행은 만들지 않음"""
+    row_ids = np.flatnonzero(row_mask)
+    if ranks is not None:
+        keys = ranks[row_ids]
+        # 1차 키: 빈 값 여부 (빈 값은 항상 뒤), 2차 키: 순위 (내림차순이면 부호 반전) — lexsort는 안정 정렬
+        row_ids = row_ids[np.lexsort((-keys if descending else keys, keys < 0))]
+    start = (page - 1) * page_size
+    return row_ids[start:start + page_size], len(row_ids)
+
+class StatsCube:
+    """조항 × 세부조항 × 구분 × 출처파일 건수 큐브 (워크북당 1회) — 통계는 큐브에서 계산"""
+
+    DIMS = ["조항", "세부조항", "구분", SOURCE_COLUMN]
+
+    def __init__(self, frame):
+        self.dims = [d for d in self.DIMS if d in frame]
+        self.labels = {}
+        row_codes = []
+        for dim in self.dims:
+            values = frame[dim]
+            codes, labels = pd.factorize(values.astype(str).where(values.notna()))
+            # 빈 값은 별도 코드(len(labels))로 — 다른 차원 집계에는 포함, 해당 차원 집계에서는 제외
+            row_codes.append(np.where(codes < 0, len(labels), codes))
+            self.labels[dim] = list(labels)
+        if self.dims:
+            coords = np.stack(row_codes, axis=1)
+            cells, self.cell_of_row = np.unique(coords, axis=0, return_inverse=True)
+            self.cell_of_row = self.cell_of_row.ravel()
+        else:
+            cells, self.cell_of_row = np.zeros((1, 0), dtype=np.int64), np.zeros(len(frame), dtype=np.int64)
+        self.cells = cells  # 셀별 차원 코드 (n_cells × n_dims)
+        self.total = np.bincount(self.cell_of_row, minlength=len(cells))
+
+    def slice(self, selections):
+        """{차원: 값 목록} 조건에 맞는 셀만 남긴 건수 (행을 다시 보지 않음, 빈 선택은 무시)"""
+        counts = self.total
+        for dim, chosen in selections.items():
+            if not chosen or dim not in self.labels:
+                continue
+            lookup = {label: code for code, label in enumerate(self.labels[dim])}
+            codes = [lookup[v] for v in chosen if v in lookup]
+            counts = counts * np.isin(self.cells[:, self.dims.index(dim)], codes)
+        return counts
+
+    def cell_counts(self, row_mask):
+        """텍스트 검색처럼 차원이 아닌 조건이 있을 때: 선택된 행만 셀별로 집계"""
+        return np.bincount(self.cell_of_row[row_mask], minlength=len(self.cells))
+
+    def marginal(self, dim, counts):
+        """셀 건수 → [dim, 건수] 표 (건수 내림차순, 0건·빈 값 제외)"""
+        labels = self.labels[dim]
+        sums = np.bincount(self.cells[:, self.dims.index(dim)], weights=counts, minlength=len(labels) + 1)
+        sums = sums[:len(labels)].astype(np.int64)
+        order = np.argsort(-sums, kind="stable")
+        order = order[sums[order] > 0]
+        return pd.DataFrame({dim: np.asarray(labels, dtype=object)[order], "건수": sums[order]})
+
+# ----------------- DuckDB 백엔드 (선택) -----------------
+class DuckDBBackend:
+    """findings / standards를 메모리 DuckDB 테이블로 등록 (워크북당 1회) — 검색 조건은 SQL로 변환
+
+    filter_mask / count_tables는 pandas 경로(FilterIndex·TextIndex·ClauseTrie·StatsCube)와 같은 결과를 돌려줌
+    집계는 조항/세부조항/구분/출처파일을 GROUPING SETS 한 번의 스캔으로 계산하며 DuckDB가 코어 수만큼 병렬 실행
+    """
+
+    DIMS = StatsCube.DIMS
+    CLAUSE_COLUMNS = ["조항", "세부조항"]
+
+    def __init__(self, findings, standards=None, threads=None):
+        self.n_rows = len(findings)
+        self.dims = [d for d in self.DIMS if d in findings]
+        # 문자열 컬럼은 string dtype으로 넘김 — object 배열이 모두 NULL이면 DuckDB가 INTEGER로 추론해 검색 SQL이 실패
+        table = {"_row": np.arange(len(findings), dtype=np.int64)}
+        for dim in self.dims:
+            values = findings[dim]
+            labels = values.astype(str).where(values.notna())
+            table[dim] = pd.array(labels, dtype="string")
+            # 동순위 정렬을 StatsCube와 맞추기 위한 전체 데이터 기준 첫 등장 순서
+            table[f"_{dim}_ord"] = pd.factorize(labels)[0]
+        for col in self.CLAUSE_COLUMNS:
+            if col in self.dims:
+                table[f"_{col}_path"] = pd.array(pd.Series(table[col], dtype=object).map(
+                    lambda v: None if pd.isna(v) else ".".join(clause_path(v)) or None
+                ), dtype="string")
+        self.has_text = "내용" in findings
+        if self.has_text:
+            text = findings["내용"]
+            table["_내용"] = pd.array(text.astype(str).where(text.notna()).str.lower(), dtype="string")
+
+        self._conn = duckdb.connect(":memory:", config={"threads": threads or os.cpu_count() or 1})
+        self._conn.register("findings_src", pd.DataFrame(table))
+        self._conn.execute("CREATE TABLE findings AS SELECT * FROM findings_src")
+        self._conn.unregister("findings_src")
+        if standards is not None:
+            std = standards.copy(deep=False)
+            for col in std.columns:
+                if std[col].dtype == object:
+                    std[col] = pd.array(std[col].where(std[col].isna(), std[col].astype(str)), dtype="string")
+            self._conn.register("standards_src", std)
+            self._conn.execute("CREATE TABLE standards AS SELECT * FROM standards_src")
+            self._conn.unregister("standards_src")
+
+    def sql(self, query, params=None):
+        """임의 SQL → DataFrame (세션마다 별도 커서라 스레드 안전)"""
+        with self._conn.cursor() as cursor:
+            return cursor.execute(query, params or []).df()
+
+    def where(self, query):
+        """검색 조건 dict → (WHERE 절, 파라미터) — engine.filter_mask와 같은 의미"""
+        conditions, params = [], []
+        for col in FILTER_COLUMNS:
+            chosen = query.get(col)
+            if chosen and col in self.dims:
+                conditions.append(f'list_contains(?, "{col}")')
+                params.append([str(v) for v in chosen])
+        groups = parse_search_query(query.get("키워드") or "")
+        if self.has_text and groups:
+            ors = []
+            for terms in groups:
+                ors.append("(" + " AND ".join("contains(_내용, ?)" for _ in terms) + ")")
+                params.extend(term.lower() for term in terms)
+            conditions.append("(" + " OR ".join(ors) + ")")
+        path = ".".join(clause_path(query.get("조항검색") or ""))
+        if path:
+            ors = []
+            for col in self.CLAUSE_COLUMNS:
+                if col in self.dims:
+                    ors.append(f"(_{col}_path = ? OR starts_with(_{col}_path, ?))")
+                    params.extend([path, path + "."])
+            conditions.append("(" + " OR ".join(ors) + ")" if ors else "FALSE")
+        return " AND ".join(conditions) or "TRUE", params
+
+    def filter_mask(self, query):
+        """검색 조건 → 행 bool 마스크"""
+        where, params = self.where(query)
+        with self._conn.cursor() as cursor:
+            rows = cursor.execute(f"SELECT _row FROM findings WHERE {where}", params).fetchnumpy()["_row"]
+        mask = np.zeros(self.n_rows, dtype=bool)
+        mask[np.asarray(rows, dtype=np.int64)] = True
+        return mask
+
+    def count_tables(self, query):
+        """검색 조건 → 차원별 [값, 건수] 표 dict (건수 내림차순, 빈 값 제외)"""
+        if not self.dims:
+            return {}
+        where, params = self.where(query)
+        cols = ", ".join(f'"{d}"' for d in self.dims)
+        ords = ", ".join(f'min(_{d}_ord) AS "_{d}_ord"' for d in self.dims)
+        flags = ", ".join(f'grouping("{d}") AS "_{d}_g"' for d in self.dims)
+        sets = ", ".join(f'("{d}")' for d in self.dims)
+        with self._conn.cursor() as cursor:
+            grouped = cursor.execute(
+                f"SELECT {cols}, count(*) AS 건수, {ords}, {flags} FROM findings WHERE {where} "
+                f"GROUP BY GROUPING SETS ({sets})",
+                params,
+            ).df()
+        tables = {}
+        for dim in self.dims:
+            part = grouped[(grouped[f"_{dim}_g"] == 0) & grouped[dim].notna()]
+            part = part.sort_values(["건수", f"_{dim}_ord"], ascending=[False, True], kind="stable")
+            tables[dim] = pd.DataFrame({
+                dim: part[dim].to_numpy(dtype=object), "건수": part["건수"].to_numpy(dtype=np.int64),
+            })
+        return tables
+
+# ----------------- 분석 -----------------
+def prepare(findings, standards=None):
+    """원본 findings → 노이즈 컬럼 제거 + 요구사항 매칭 + 범주형 압축"""
+    return compact_frame(add_req_text(drop_noise_columns(findings), standards))
+
+def filter_mask(findings, query):
+    """검색 조건 → 행 bool 마스크 (앱 사이드바와 같은 의미, 인덱스는 호출마다 생성)
+
+    query: {"조항", "세부조항", "구분": 선택값 목록, "키워드", "조항검색": 문자열} — 없는 키는 조건 없음
+    """
+    row_mask = FilterIndex(findings).select({col: query.get(col) for col in FILTER_COLUMNS})
+    if "내용" in findings and query.get("키워드"):
+        keyword_mask = TextIndex(findings["내용"]).search(query["키워드"])
+        if keyword_mask is not None:
+            row_mask &= keyword_mask
+    if query.get("조항검색"):
+        clause_mask = ClauseTrie(findings).search(query["조항검색"])
+        if clause_mask is not None:
+            row_mask &= clause_mask
+    return row_mask
+
+def count_tables(findings, row_mask):
+    """선택된 행의 차원별 [값, 건수] 표 dict (조항/세부조항/구분/출처파일)"""
+    cube = StatsCube(findings)
+    counts = cube.cell_counts(row_mask)
+    return {dim: cube.marginal(dim, counts) for dim in cube.dims}
+
+def analyze(findings, standards=None, query=None, top_nouns=10, noun_workers=NOUN_WORKERS, store=None,
+            backend="pandas", noun_backend=NOUN_BACKEND):
+    """워크북 1개 분석 → (검색 결과 행, 차원별 건수 표 dict, 명사 TOP n Series 또는 None)
+
+    명사 표는 명사 백엔드를 쓸 수 없거나 top_nouns=0이면 None, backend="duckdb"면 검색·집계를 DuckDB로 실행
+    """
+    frame = prepare(findings, standards)
+    query = query or {}
+    if backend == "duckdb":
+        duck = DuckDBBackend(frame, standards)
+        row_mask, tables = duck.filter_mask(query), duck.count_tables(query)
+    else:
+        row_mask = filter_mask(frame, query)
+        tables = count_tables(frame, row_mask)
+    matched = frame[row_mask]
+    nouns = None
+    if top_nouns and noun_backend_available(noun_backend) and "내용" in frame:
+        counter = extract_nouns(matched["내용"], workers=noun_workers, store=store, backend=noun_backend)
+        nouns = pd.Series(dict(counter.most_common(top_nouns)), name="count", dtype=np.int64)
+    return matched, tables, nouns
@@ -0,0 +1,67 @@
+"""검색 결과 내보내기 (xlsx 스트리밍 / csv / csv.gz / parquet) — Streamlit 없이 사용 가능"""
+from io import BytesIO
+
+import xlsxwriter
+
+XLSX_CHUNK_ROWS = 10_000
+
+def write_xlsx(frame, target, sheet_name="Sheet1", chunk_rows=XLSX_CHUNK_ROWS):
+    """xlsxwriter constant_memory 모드로 행 순서대로 기록 (전체 시트를 메모리에 두지 않음)
+
+    target: 파일 경로 또는 바이너리 file-like
+    """
+    workbook = xlsxwriter.Workbook(target, {
+        "constant_memory": True,
+        "strings_to_urls": False,
+        "strings_to_formulas": False,
+        "default_date_format": "yyyy-mm-dd",
+    })
+    try:
+        sheet = workbook.add_worksheet(sheet_name)
+        sheet.write_row(0, 0, [str(c) for c in frame.columns])
+        for start in range(0, len(frame), chunk_rows):
+            chunk = frame.iloc[start:start + chunk_rows].astype(object)
+            # NaN/NaT는 빈 셀로 (xlsxwriter는 NaN을 쓸 수 없음)
+            rows = chunk.where(chunk.notna(), None).to_numpy().tolist()
+            for offset, row in enumerate(rows, start=start + 1):
+                sheet.write_row(offset, 0, row)
+    finally:
+        workbook.close()
+
+def arrow_safe(frame):
+    """숫자·문자 혼합 object 컬럼(예: 조항 7, "7.1")을 문자열로 통일 — parquet 변환용"""
+    out = frame.copy(deep=False)
+    for col in out.columns:
+        if out[col].dtype == object:
+            values = out[col]
+            out[col] = values.where(values.isna(), values.astype(str))
+    return out
+
+def _write_csv(frame, target):
+    # 한글이 엑셀에서 깨지지 않도록 BOM 포함
+    frame.to_csv(target, index=False, encoding="utf-8-sig")
+
+def _write_csv_gz(frame, target):
+    frame.to_csv(target, index=False, encoding="utf-8-sig", compression="gzip")
+
+def _write_parquet(frame, target):
+    arrow_safe(frame).to_parquet(target, index=False)
+
+# 형식 → (확장자, MIME, writer)
+EXPORT_FORMATS = {
+    "xlsx": ("xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", write_xlsx),
+    "csv": ("csv", "text/csv", _write_csv),
+    "csv.gz": ("csv.gz", "application/gzip", _write_csv_gz),
+    "parquet": ("parquet", "application/vnd.apache.parquet", _write_parquet),
+}
+
+def write_frame(frame, target, fmt="xlsx"):
+    """frame을 fmt 형식으로 target(경로 또는 file-like)에 기록"""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"지원하지 않는 형식: {fmt} (가능: {', '.join(EXPORT_FORMATS)})")
+    EXPORT_FORMATS[fmt][2](frame, target)
+
+def export_bytes(frame, fmt="xlsx"):
+    buffer = BytesIO()
+    write_frame(frame, buffer, fmt)
+    return buffer.getvalue()
@@ -0,0 +1,78 @@
+"""업로드 파일 파싱 (xlsx / parquet / zip) — 프로세스 풀에서 import 가능하도록 Streamlit과 분리"""
+import hashlib
+import multiprocessing
+import os
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+
+import pandas as pd
+
+INGEST_SUFFIXES = (".xlsx", ".parquet")
+INGEST_WORKERS = min(8, os.cpu_count() or 1)
+
+def parse_workbook(data, name="upload.xlsx"):
+    """업로드 바이트 → (findings, standards 또는 None)
+
+    xlsx는 한 번만 열어 모든 시트를 파싱, parquet은 findings만 담은 파일로 간주
+    """
+    if name.lower().endswith(".parquet"):
+        return pd.read_parquet(BytesIO(data)), None
+    sheets = list(pd.read_excel(BytesIO(data), sheet_name=None).values())
+    findings = sheets[0]
+    standards = sheets[1] if len(sheets) > 1 else None
+    return findings, standards
+
+def _zip_member_name(info):
+    # UTF-8 플래그가 없는 이름은 Windows 한글 zip(cp949)일 가능성이 높음
+    if info.flag_bits & 0x800:
+        return info.filename
+    try:
+        return info.filename.encode("cp437").decode("cp949")
+    except (UnicodeEncodeError, UnicodeDecodeError):
+        return info.filename
+
+def expand_uploads(files):
+    """[(파일명, bytes)] → zip은 안의 xlsx/parquet 파일들로 펼친 [(파일명, bytes)]"""
+    out = []
+    for name, data in files:
+        if not name.lower().endswith(".zip"):
+            out.append((name, data))
+            continue
+        with zipfile.ZipFile(BytesIO(data)) as archive:
+            for info in archive.infolist():
+                member = _zip_member_name(info)
+                base = member.rsplit("/", 1)[-1]
+                # 폴더, 엑셀 잠금 파일(~$), macOS 메타데이터(._) 등은 제외
+                if info.is_dir() or base.startswith(("~$", ".")) or not base.lower().endswith(INGEST_SUFFIXES):
+                    continue
+                out.append((member, archive.read(info)))
+    return out
+
+def content_key(data):
+    """파일 바이트 → SHA-256 내용 해시 (업로드 캐시·스냅숏·누적 저장소 적재 기록 공통)"""
+    return hashlib.sha256(data).hexdigest()
+
+def upload_batch_key(keys):
+    """파일별 내용 해시 목록 → 한 번에 올린 묶음의 키 (파일 1개면 그 해시 그대로)"""
+    return keys[0] if len(keys) == 1 else hashlib.sha256("".join(keys).encode()).hexdigest()
+
+def timed_parse(item):
+    """(파일명, bytes) → (parsed 또는 None, 오류 메시지 또는 None, 파싱 초)"""
+    name, data = item
+    started = time.perf_counter()
+    try:
+        parsed = parse_workbook(data, name)
+    except Exception as e:  # 손상된 파일 등은 건너뛰고 결과에 보고
+        return None, f"{type(e).__name__}: {e}", time.perf_counter() - started
+    return parsed, None, time.perf_counter() - started
+
+def parse_many(items, workers=INGEST_WORKERS):
+    """[(파일명, bytes)] → 같은 순서의 timed_parse 결과 목록 (2개 이상이면 프로세스 풀로 동시 파싱)"""
+    if workers <= 1 or len(items) <= 1:
+        return [timed_parse(item) for item in items]
+    # Streamlit 서버 스레드를 fork하지 않도록 spawn 사용
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=min(workers, len(items)), mp_context=context) as pool:
+        return list(pool.map(timed_parse, items))
@@ -0,0 +1,153 @@
+"""JVM 없이 동작하는 한국어 명사 추출기 — 사전 트라이 + 조사·어미 접미사 제거 (Okt의 nouns()와 같은 인터페이스)
+
+SimpleNounExtractor (engine의 "simple" 백엔드):
+
+어절마다 끝의 조사/어미 후보를 역방향 트라이로 찾고, 남은 어간을 명사 사전 트라이로 분할
+- 어간이 사전 단어로 모두 덮이면 그 분할을 사용 (접미사는 가장 짧게 = 어간은 가장 길게)
+- 사전에 없는 어간은 접미사를 떼고 2글자 이상 남으면 미등록 명사로 간주
+사전은 인정평가 부적합 문장에 자주 나오는 명사 + FINDINGS_NOUN_LEXICON(한 줄에 한 단어) 파일
+
+NgramTokenizer ("ngram" 백엔드): 사전 없이 조사/어미만 떼고 글자 n-gram — 어떤 문장에도 동작하는 최후 수단
+"""
+import hashlib
+import os
+import re
+from pathlib import Path
+
+# 인정평가 / 경영시스템 심사 문장에 자주 나오는 명사 (복합어는 구성 명사로 나뉘도록 단일 명사만)
+LEXICON = """
+심사 심사원 심사팀 평가 평가사 평가원 인정 인증 인증서 인증기관 기관 기준 요구 요구사항 사항 조항 세부조항 항목
+부적합 권고 관찰 개선 기회 시정 조치 예방 재발 방지 원인 분석 결과 효과 효과성 유효성 검증 확인 검토 승인 누락
+계획 계획서 절차 절차서 기록 문서 문서화 관리 관리자 관리대장 대장 규정 지침 양식 서식 매뉴얼 표준 보존 보관 기간
+경영 경영자 경영진 경영시스템 시스템 품질 환경 안전 보건 정보 보안 자원 인프라 인적 인원 배치 역량 교육 훈련 자격
+고객 만족 만족도 조사 불만 처리 민원 이의 제기 공평성 독립성 비밀 유지 위험 리스크 이슈 이해관계자 상황 범위 적용
+내부 외부 감사 프로그램 보고서 보고 회의 회의록 결정 발행 갱신 재인증 사후 정기 최초 재평가 일정 주기 적시 최신
+최신화 수립 이행 미이행 준수 미준수 미흡 필요 충분 충분성 적절 적절성 적정 확보 제공 실시 수행 실행 운영 운용 점검
+모니터링 측정 성과 목표 방침 책임 권한 조직 프로세스 변경 설계 개발 제품 서비스 구매 외주 공급자 계약 계약서 협력
+업체 신청 신청서 접수 법규 규제 의사소통 리더십 지원 비상 대응 사고 준비 능력 인식 지식 데이터 자료 파일 현장
+작업 기술 전문가 위원회 담당자 담당 부서 책임자 교정 장비 설비 시험 검사 식별 추적 추적성 증거 객관 근거 여부
+일부 전체 부분 대상 내용 사용 작성 제출 등록 기재 명시 반영 정의 구분 연간 분기 월 년 건 수 등 것 때 중 후 전
+"""
+
+# 명사 뒤에 붙는 조사 (결합형 포함)
+JOSA = """
+이 가 은 는 을 를 의 에 에서 에게 께 로 으로 와 과 도 만 까지 부터 보다 처럼 마다 이나 나 이며 이고 이라 라
+에서는 에서의 에서도 에게는 에는 에도 에의 으로는 으로의 으로도 로는 로의 로도 과의 와의 과는 와는 까지는 부터는
+이라는 라는 이라고 라고 이란 란 만을 만이 도록
+"""
+
+# 명사 + 하다/되다/시키다/이다 활용, -적 파생
+EOMI = """
+하다 한다 하여 하여야 해야 하고 하지 하는 하며 하면 함 했음 하였음 하였으나 하였고 했으나 할 한 하기 하도록 하였다 했다 하게
+되다 된다 되어 되어야 되고 되지 되는 되며 되면 됨 되었음 됐음 되었으나 될 된 되기 되도록 되었다 되게
+시킴 시키지 시키는 시켜 시킨 이다 임 이므로 인 적 적인 적으로 적이지 상 상의
+"""
+
+# 조사/어미를 떼면 명사처럼 보이는 용언·부사 어절 (통째로 제외)
+NON_NOUNS = """
+있음 있지 있는 있고 있어 있으나 있도록 없음 없이 없는 없고 없어 없으나 않음 않고 않은 않는 않아 않았음 않도록
+아님 아닌 아니라 같음 같은 같이 대한 대해 대하여 위한 위해 위하여 따른 따라 통한 통해 관한 보다 또는 및 그리고
+"""
+
+_HANGUL_RUN = re.compile(r"[가-힣]+")
+_END = ""  # 트라이 단말 표시
+
+def build_trie(words, reverse=False):
+    """단어 목록 → dict 트라이 (reverse=True면 뒤에서부터, 접미사 검색용)"""
+    root = {}
+    for word in words:
+        node = root
+        for ch in (reversed(word) if reverse else word):
+            node = node.setdefault(ch, {})
+        node[_END] = True
+    return root
+
+def suffix_cuts(trie, word):
+    """word 끝에서 일치하는 조사/어미 길이 목록 (짧은 것부터, 0 = 접미사 없음, 어간은 1글자 이상 남김)"""
+    cuts, node = [0], trie
+    for i, ch in enumerate(reversed(word), start=1):
+        node = node.get(ch)
+        if node is None or i >= len(word):
+            break
+        if _END in node:
+            cuts.append(i)
+    return cuts
+
+def _load_lexicon(path):
+    words = LEXICON.split()
+    path = path or os.environ.get("FINDINGS_NOUN_LEXICON")
+    if path and Path(path).is_file():
+        words += [w.strip() for w in Path(path).read_text(encoding="utf-8").splitlines() if w.strip()]
+    return sorted(set(words))
+
+def lexicon_version(path=None):
+    """사전 내용 해시 — 사전이 바뀌면 결과도 바뀌므로 명사 캐시(NounStore) 키에 포함"""
+    words = _load_lexicon(path)
+    return "simple-1-" + hashlib.sha1("\n".join(words).encode("utf-8")).hexdigest()[:8]
+
+_SUFFIXES = build_trie(set(JOSA.split()) | set(EOMI.split()), reverse=True)
+_SKIP = frozenset(NON_NOUNS.split())
+
+class SimpleNounExtractor:
+    """사전 + 접미사 규칙 명사 추출기 (스레드 안전, 상태 없음)"""
+
+    def __init__(self, lexicon_path=None):
+        self._nouns = build_trie(_load_lexicon(lexicon_path))
+        self.version = lexicon_version(lexicon_path)
+
+    def _segment(self, stem):
+        """어간 → 사전 단어 분할 목록 (모두 덮을 수 없으면 None, 가장 적은 조각 우선)"""
+        n = len(stem)
+        best = [None] * (n + 1)  # best[i] = stem[:i]의 최소 분할
+        best[0] = []
+        for i in range(n):
+            if best[i] is None:
+                continue
+            node = self._nouns
+            for j in range(i, n):
+                node = node.get(stem[j])
+                if node is None:
+                    break
+                if _END in node and (best[j + 1] is None or len(best[i]) + 1 < len(best[j + 1])):
+                    best[j + 1] = best[i] + [stem[i:j + 1]]
+        return best[n]
+
+    def _word_nouns(self, word):
+        cuts = suffix_cuts(_SUFFIXES, word)
+        for cut in cuts:
+            pieces = self._segment(word[:len(word) - cut])
+            if pieces:
+                return pieces
+        # 미등록 명사: 가장 긴 접미사를 떼고 2글자 이상 남으면 명사로
+        for cut in reversed(cuts):
+            stem = word[:len(word) - cut]
+            if len(stem) >= 2:
+                return [stem]
+        return []
+
+    def nouns(self, text):
+        """문장 → 등장 순서대로 명사 목록 (Okt.nouns와 같은 형태)"""
+        out = []
+        for word in _HANGUL_RUN.findall(str(text)):
+            if word not in _SKIP:
+                out.extend(self._word_nouns(word))
+        return out
+
+class NgramTokenizer:
+    """사전 없는 글자 n-gram 분할 (조사/어미를 뗀 어절 기준, n글자 이하 어절은 그대로)"""
+
+    def __init__(self, n=2):
+        self.n = n
+        self.version = f"ngram-{n}"
+
+    def nouns(self, text):
+        out = []
+        for word in _HANGUL_RUN.findall(str(text)):
+            if word in _SKIP:
+                continue
+            cut = max(c for c in suffix_cuts(_SUFFIXES, word) if len(word) - c >= self.n or c == 0)
+            stem = word[:len(word) - cut]
+            if len(stem) < self.n:
+                continue
+            out.extend(stem[i:i + self.n] for i in range(len(stem) - self.n + 1))
+        return out
@@ -0,0 +1,366 @@
+"""누적 부적합 저장소 (SQLite + FTS5) — 업로드를 한 번만 적재하고 다시 파싱하지 않고 검색·집계
+
+- 행 내용 해시로 중복 제거 (같은 행이 여러 파일에 있어도 1건)
+- 내용·요구사항 FTS5 trigram 색인: 3글자 이상 검색어는 색인, 1·2글자는 instr로 확인
+- 조항 × 세부조항 × 구분 × 출처파일 건수 큐브 테이블: 텍스트 검색이 없으면 큐브만 읽음
+- 행별 명사 빈도(row_nouns)와 셀 × 명사 큐브(noun_cube)를 적재 시 계산: 명사 TOP n도 SQL 집계 1번
+
+사용법 (과거 파일 일괄 적재): python warehouse.py add 폴더_또는_파일 ...
+명사 분석기를 바꾼 뒤 명사 색인 다시 만들기: python warehouse.py nouns
+"""
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from engine import (
+    FILTER_COLUMNS, NOUN_BACKEND, NOUN_BACKENDS, SOURCE_COLUMN, clause_path, noun_backend_available, noun_lists,
+    parse_search_query, prepare,
+)
+from ingest import INGEST_SUFFIXES, content_key, expand_uploads, parse_workbook, upload_batch_key
+
+WAREHOUSE_PATH = Path(os.environ.get(
+    "FINDINGS_WAREHOUSE", Path(__file__).resolve().parent / "data" / "warehouse.sqlite3"
+))
+# 저장 컬럼 (조항/세부조항은 계층 검색용 경로·자연 정렬 키를 함께 저장)
+COLUMNS = ["인정기준", "조항", "세부조항", "구분", "요구사항", "내용", SOURCE_COLUMN]
+HASH_COLUMNS = ["인정기준", "조항", "세부조항", "구분", "내용"]
+CLAUSE_COLUMNS = ["조항", "세부조항"]
+CUBE_DIMS = ["조항", "세부조항", "구분", SOURCE_COLUMN]
+TRIGRAM = 3
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS findings (
+    id INTEGER PRIMARY KEY,
+    row_hash TEXT NOT NULL UNIQUE,
+    {", ".join(f'"{c}" TEXT' for c in COLUMNS)},
+    {", ".join(f'"{c}_경로" TEXT, "{c}_정렬" TEXT' for c in CLAUSE_COLUMNS)}
+);
+{"".join(f'CREATE INDEX IF NOT EXISTS "idx_{c}" ON findings ("{c}");' for c in FILTER_COLUMNS)}
+{"".join(f'CREATE INDEX IF NOT EXISTS "idx_{c}_{s}" ON findings ("{c}_{s}");' for c in CLAUSE_COLUMNS for s in ("경로", "정렬"))}
+CREATE VIRTUAL TABLE IF NOT EXISTS findings_fts USING fts5(
+    "내용", "요구사항", content="findings", content_rowid="id", tokenize="trigram"
+);
+CREATE TABLE IF NOT EXISTS cube (
+    {", ".join(f'"{d}" TEXT' for d in CUBE_DIMS)}, n INTEGER NOT NULL, first_id INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS row_nouns (
+    id INTEGER NOT NULL, noun TEXT NOT NULL, n INTEGER NOT NULL, PRIMARY KEY (id, noun)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS noun_cube (
+    {", ".join(f'"{d}" TEXT' for d in CUBE_DIMS)}, noun TEXT NOT NULL, n INTEGER NOT NULL, first_id INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS loads (
+    batch_key TEXT PRIMARY KEY, added INTEGER NOT NULL, duplicates INTEGER NOT NULL,
+    loaded_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
+def clause_sort_text(value):
+    """조항 자연 정렬용 문자열: 7.2 < 7.10 < 10 (숫자 구간은 0으로 채움)"""
+    return ".".join(seg.zfill(8) if seg.isdigit() else seg for seg in clause_path(value))
+
+def _text(values):
+    """Series → 문자열 또는 None 목록 (범주형/숫자 혼합 포함)"""
+    return [None if pd.isna(v) else str(v) for v in values]
+
+def row_hashes(frame):
+    """중복 판정용 행 해시 — 출처파일·요구사항(파생 값)은 제외"""
+    cols = [_text(frame[c]) if c in frame else [None] * len(frame) for c in HASH_COLUMNS]
+    return [hashlib.sha1(json.dumps(row, ensure_ascii=False).encode("utf-8")).hexdigest() for row in zip(*cols)]
+
+class Warehouse:
+    """SQLite 누적 저장소 (프로세스당 1개 연결, 스레드 안전)"""
+
+    def __init__(self, path=WAREHOUSE_PATH):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+        self._lock = threading.Lock()
+        self._noun_lock = threading.Lock()
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    # ----------------- 적재 -----------------
+    def has_batch(self, batch_key):
+        return bool(self._query("SELECT 1 FROM loads WHERE batch_key = ?", (batch_key,)))
+
+    def append(self, findings, batch_key=None):
+        """정리된 findings(engine.prepare 결과) 추가 → (추가 건수, 중복 건수) — 새 행의 명사 색인까지
+
+        batch_key가 이미 적재된 업로드면 아무것도 하지 않고 (0, 0)
+        """
+        if batch_key is not None and self.has_batch(batch_key):
+            return 0, 0
+        columns = [_text(findings[c]) if c in findings else [None] * len(findings) for c in COLUMNS]
+        rows = []
+        for key, values in zip(row_hashes(findings), zip(*columns)):
+            record = dict(zip(COLUMNS, values))
+            extra = []
+            for col in CLAUSE_COLUMNS:
+                value = record[col]
+                extra += [None, None] if value is None else [".".join(clause_path(value)) or None, clause_sort_text(value)]
+            rows.append((key, *values, *extra))
+        names = ["row_hash", *COLUMNS, *(f"{c}_{s}" for c in CLAUSE_COLUMNS for s in ("경로", "정렬"))]
+        quoted = ", ".join(f'"{n}"' for n in names)
+        insert = f"INSERT OR IGNORE INTO findings ({quoted}) VALUES ({', '.join('?' * len(names))})"
+        with self._lock:
+            before = self._conn.total_changes
+            last_id = self._conn.execute("SELECT coalesce(max(id), 0) FROM findings").fetchone()[0]
+            self._conn.executemany(insert, rows)
+            added = self._conn.total_changes - before
+            # 새 행만 FTS 색인 + 큐브 갱신 (기존 행은 다시 보지 않음)
+            self._conn.execute(
+                'INSERT INTO findings_fts (rowid, "내용", "요구사항") '
+                'SELECT id, "내용", "요구사항" FROM findings WHERE id > ?', (last_id,)
+            )
+            dims = ", ".join(f'"{d}"' for d in CUBE_DIMS)
+            self._conn.execute(
+                f"INSERT INTO cube ({dims}, n, first_id) SELECT {dims}, count(*), min(id) "
+                f"FROM findings WHERE id > ? GROUP BY {dims}", (last_id,)
+            )
+            if batch_key is not None:
+                self._conn.execute(
+                    "INSERT INTO loads (batch_key, added, duplicates) VALUES (?, ?, ?)",
+                    (batch_key, added, len(rows) - added),
+                )
+            self._conn.commit()
+        self.index_nouns()
+        return added, len(rows) - added
+
+    def index_nouns(self, backend=NOUN_BACKEND):
+        """명사 색인이 없는 행의 명사 빈도를 row_nouns / noun_cube에 추가 → 색인한 행 수
+
+        분석기(버전)가 바뀌었으면 전체를 다시 색인 (문장별 결과는 NounStore 캐시를 거치므로 새 문장만 분석)
+        분석기를 쓸 수 없으면 건너뛰고 0 — 나중에 python warehouse.py nouns로 색인
+        """
+        if not noun_backend_available(backend):
+            return 0
+        version = NOUN_BACKENDS[backend][2]
+        with self._noun_lock:
+            meta = dict(self._query("SELECT key, value FROM meta"))
+            done = int(meta.get("noun_max_id", 0)) if meta.get("noun_version") == version else 0
+            last = self._query("SELECT coalesce(max(id), 0) FROM findings")[0][0]
+            rows = self._query(
+                'SELECT id, "내용" FROM findings WHERE id > ? AND id <= ? AND "내용" IS NOT NULL', (done, last)
+            )
+            lists = noun_lists(list(dict.fromkeys(text for _, text in rows)), backend=backend)
+            records = [(i, noun, n) for i, text in rows for noun, n in Counter(lists[text]).items()]
+            dims = ", ".join(f'f."{d}"' for d in CUBE_DIMS)
+            with self._lock:
+                if not done:
+                    self._conn.execute("DELETE FROM row_nouns")
+                    self._conn.execute("DELETE FROM noun_cube")
+                self._conn.executemany("INSERT OR REPLACE INTO row_nouns (id, noun, n) VALUES (?, ?, ?)", records)
+                self._conn.execute(
+                    f"INSERT INTO noun_cube SELECT {dims}, r.noun, sum(r.n), min(r.id) "
+                    f"FROM row_nouns r JOIN findings f ON f.id = r.id WHERE r.id > ? AND r.id <= ? "
+                    f"GROUP BY {dims}, r.noun", (done, last),
+                )
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                    [("noun_version", version), ("noun_max_id", str(last))],
+                )
+                self._conn.commit()
+        return len(rows)
+
+    # ----------------- 조회 -----------------
+    def version(self):
+        """(행 수, 마지막 id) — 적재 후 달라지므로 화면 캐시 키로 사용"""
+        return tuple(self._query(
+            "SELECT (SELECT coalesce(sum(n), 0) FROM cube), (SELECT coalesce(max(id), 0) FROM findings)"
+        )[0])
+
+    def noun_version(self):
+        """명사 색인을 만든 분석기 버전 (색인 전이면 None)"""
+        rows = self._query("SELECT value FROM meta WHERE key = 'noun_version'")
+        return rows[0][0] if rows else None
+
+    def options(self):
+        """사이드바 선택지 {컬럼: 정렬된 값 목록} (큐브에서 읽음)"""
+        return {
+            col: [v for (v,) in self._query(f'SELECT DISTINCT "{col}" FROM cube WHERE "{col}" IS NOT NULL ORDER BY 1')]
+            for col in FILTER_COLUMNS
+        }
+
+    @staticmethod
+    def _dim_conditions(query):
+        conditions, params = [], []
+        for col in FILTER_COLUMNS:
+            chosen = query.get(col)
+            if chosen:
+                conditions.append(f'"{col}" IN ({", ".join("?" * len(chosen))})')
+                params.extend(str(v) for v in chosen)
+        return conditions, params
+
+    def where(self, query):
+        """검색 조건 dict → (WHERE 절, 파라미터) — engine.filter_mask와 같은 의미"""
+        conditions, params = self._dim_conditions(query)
+        groups = parse_search_query(query.get("키워드") or "")
+        if groups:
+            ors = []
+            for terms in groups:
+                ands = []
+                long_terms = [t for t in terms if len(t) >= TRIGRAM]
+                if long_terms:
+                    phrase = " AND ".join('"' + t.replace('"', '""') + '"' for t in long_terms)
+                    ands.append("id IN (SELECT rowid FROM findings_fts WHERE findings_fts MATCH ?)")
+                    params.append(f"내용 : ({phrase})")
+                for term in terms:
+                    if len(term) < TRIGRAM:
+                        ands.append('instr(lower("내용"), ?) > 0')
+                        params.append(term.lower())
+                ors.append("(" + " AND ".join(ands) + ")")
+            conditions.append("(" + " OR ".join(ors) + ")")
+        path = ".".join(clause_path(query.get("조항검색") or ""))
+        if path:
+            ors = []
+            for col in CLAUSE_COLUMNS:
+                # 하위 조항 = "경로." 로 시작하는 값 → 색인 범위 검색 ("." 다음 문자는 "/")
+                ors.append(f'("{col}_경로" = ? OR ("{col}_경로" >= ? AND "{col}_경로" < ?))')
+                params.extend([path, path + ".", path + "/"])
+            conditions.append("(" + " OR ".join(ors) + ")")
+        return " AND ".join(conditions) or "1", params
+
+    def page(self, query, page, page_size, sort_col=None, descending=False):
+        """검색 결과 중 한 페이지 → DataFrame — 정렬·페이지 나누기는 SQL에서 (빈 값은 맨 뒤)"""
+        where, params = self.where(query)
+        order = "id"
+        if sort_col in COLUMNS:
+            key = f'"{sort_col}_정렬"' if sort_col in CLAUSE_COLUMNS else f'"{sort_col}"'
+            order = f"{key} IS NULL, {key}{' DESC' if descending else ''}, id"
+        cols = ", ".join(f'"{c}"' for c in COLUMNS)
+        with self._lock:
+            frame = pd.read_sql_query(
+                f"SELECT {cols} FROM findings WHERE {where} ORDER BY {order} LIMIT ? OFFSET ?",
+                self._conn, params=[*params, page_size, (page - 1) * page_size],
+            )
+        return frame
+
+    def rows(self, query):
+        """검색 결과 전체 → DataFrame (다운로드·명사 분석용)"""
+        where, params = self.where(query)
+        cols = ", ".join(f'"{c}"' for c in COLUMNS)
+        with self._lock:
+            return pd.read_sql_query(f"SELECT {cols} FROM findings WHERE {where} ORDER BY id", self._conn, params=params)
+
+    def cells(self, query):
+        """검색 조건 → 조항 × 세부조항 × 구분 × 출처파일 셀별 건수(n) DataFrame — 집계 쿼리 1번
+
+        조항/세부조항/구분 선택만 있으면 큐브 테이블에서, 텍스트·조항 검색이 있으면 해당 행에서 집계
+        """
+        dims = ", ".join(f'"{d}"' for d in CUBE_DIMS)
+        if query.get("키워드") or query.get("조항검색"):
+            where, params = self.where(query)
+            source, count = f"findings WHERE {where}", "count(*)"
+        else:
+            conditions, params = self._dim_conditions(query)
+            source, count = f"cube WHERE {' AND '.join(conditions) or '1'}", "sum(n)"
+        with self._lock:
+            return pd.read_sql_query(
+                f"SELECT {dims}, {count} AS n FROM {source} GROUP BY {dims}", self._conn, params=params,
+            )
+
+    def top_nouns(self, query, n=10):
+        """검색 조건 → 명사 TOP n Series (명사 색인이 없으면 None) — 검색 결과 행을 읽지 않고 SQL로 집계
+
+        텍스트·조항 검색이 있으면 해당 행의 row_nouns에서, 조항/세부조항/구분 선택만 있으면 noun_cube에서
+        동률은 먼저 적재된 명사 우선
+        """
+        if self.noun_version() is None:
+            return None
+        if query.get("키워드") or query.get("조항검색"):
+            where, params = self.where(query)
+            source, first = f"row_nouns WHERE id IN (SELECT id FROM findings WHERE {where})", "min(id)"
+        else:
+            conditions, params = self._dim_conditions(query)
+            source, first = f"noun_cube WHERE {' AND '.join(conditions) or '1'}", "min(first_id)"
+        rows = self._query(
+            f"SELECT noun, sum(n) FROM {source} GROUP BY noun ORDER BY 2 DESC, {first} LIMIT ?", (*params, n)
+        )
+        return pd.Series(dict(rows), name="count", dtype=np.int64)
+
+    def count_tables(self, query=None, cells=None):
+        """셀별 건수(없으면 query로 계산) → 차원별 [값, 건수] 표 dict
+
+        건수 내림차순, 동률은 저장소에 먼저 적재된 값 우선 (업로드 화면의 StatsCube와 같은 순서)
+        """
+        if cells is None:
+            cells = self.cells(query)
+        tables = {}
+        for dim in CUBE_DIMS:
+            first = dict(self._query(f'SELECT "{dim}", min(first_id) FROM cube GROUP BY "{dim}"'))
+            sums = cells.groupby(dim, dropna=True)["n"].sum()
+            table = pd.DataFrame({
+                dim: sums.index.to_numpy(dtype=object), "건수": sums.to_numpy(dtype=np.int64),
+                "_first": [first.get(v) for v in sums.index],
+            })
+            table = table[table["건수"] > 0].sort_values(["건수", "_first"], ascending=[False, True], kind="stable")
+            tables[dim] = table[[dim, "건수"]].reset_index(drop=True)
+        return tables
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+    add = sub.add_parser("add", help="워크북(xlsx / parquet / zip) 또는 폴더를 저장소에 적재")
+    add.add_argument("paths", nargs="+")
+    add.add_argument("--standards", help="워크북에 기준 시트가 없을 때 사용할 기준 xlsx")
+    sub.add_parser("nouns", help="현재 명사 분석기(FINDINGS_NOUN_BACKEND)로 명사 색인 갱신 — 분석기가 바뀌었으면 전체")
+    parser.add_argument("--db", default=str(WAREHOUSE_PATH), help="저장소 경로")
+    args = parser.parse_args()
+
+    warehouse = Warehouse(args.db)
+    if args.command == "nouns":
+        if not noun_backend_available():
+            parser.error(f"명사 분석기 '{NOUN_BACKEND}' 모듈이 없습니다")
+        print(f"{warehouse.index_nouns():,}건 명사 색인 ({warehouse.noun_version()})")
+        return
+    default_standards = None
+    if args.standards:
+        default_standards = parse_workbook(Path(args.standards).read_bytes(), args.standards)[0]
+    paths = []
+    for arg in map(Path, args.paths):
+        paths.extend(sorted(p for p in arg.rglob("*") if p.is_file()) if arg.is_dir() else [arg])
+    for path in paths:
+        if path.suffix.lower() not in INGEST_SUFFIXES + (".zip",) or path.name.startswith("~$"):
+            continue
+        # 파일 하나(zip은 안의 파일 전부)를 앱에서 그 파일을 올린 것과 같은 키·같은 묶음으로 적재
+        items = expand_uploads([(path.name, path.read_bytes())])
+        if not items:
+            continue
+        batch_key = upload_batch_key([content_key(data) for _, data in items])
+        if warehouse.has_batch(batch_key):
+            print(f"{path}: 이미 적재한 파일")
+            continue
+        frames, standards = [], None
+        for name, data in items:
+            try:
+                findings, member_standards = parse_workbook(data, name)
+            except Exception as e:  # 손상된 파일 등은 건너뜀
+                print(f"{path}:{name}: 오류 {type(e).__name__}: {e}")
+                continue
+            frames.append(findings.assign(**{SOURCE_COLUMN: name}))
+            if standards is None:
+                standards = member_standards
+        if not frames:
+            continue
+        findings = prepare(pd.concat(frames, ignore_index=True), standards if standards is not None else default_standards)
+        added, duplicates = warehouse.append(findings, batch_key)
+        print(f"{path}: {added:,}건 추가, {duplicates:,}건 중복")
+    rows, _ = warehouse.version()
+    print(f"저장소 {args.db}: 총 {rows:,}건")
+
+if __name__ == "__main__":
+    main()